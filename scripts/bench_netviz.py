@@ -0,0 +1,328 @@
+#benchmarks the netviz_v5 pipeline against synthetic topologies of increasing size
+#
+#python3 scripts/bench_netviz.py emit --sizes 1000 2000 4000 8000
+#use the above command to check that DOT emission grows linearly with device count
+#
+#python3 scripts/bench_netviz.py sanitize --sizes 10000 100000
+#use the above command to compare vectorized sanitization with the old per-cell replace chain
+#
+#python3 scripts/bench_netviz.py suite --devices 1000 10000 --ports 48 480 --render -o bench.json
+#use the above command to time and memory-profile every generator variant, stage by stage, on seeded
+#synthetic inputs; variants whose imports fail (e.g. Gooey not installed) are listed as skipped
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import netviz_v5
+import synth_topology
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_topology(device_count: int, locations: int = 8, zones_per_location: int = 4, seed: int = 0) -> pd.DataFrame:
+    """Builds a synthetic, already-sanitized topology DataFrame with one row per device."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(device_count):
+        location = f"Building_{i % locations}"
+        zone = f"Rack_{(i // locations) % zones_per_location}"
+        rows.append({
+            'Domotz Name': f"SW{i:06d}",
+            'Location': location,
+            'Zone': zone,
+            'Model': rng.choice(['FS-248E-FPOE', 'CEN-SW-POE-5', 'Fortigate_100F']),
+            'MAC': f"{rng.getrandbits(48):012X}",
+            'IP Address': f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+            'Uplink': 'Internet' if i == 0 else f"SW{rng.randrange(i):06d}",
+            'Source Port': f"Port{rng.randrange(1, 49)}",
+            'Destination Port': f"Port{rng.randrange(1, 49)}",
+        })
+    return pd.DataFrame(rows)
+
+
+def legacy_device_lookup(df: pd.DataFrame, zones: dict):
+    """The original per-device boolean-mask scan, kept only for comparison."""
+    for zone_dict in zones.values():
+        for devices in zone_dict.values():
+            for device in devices:
+                df[df['Domotz Name'] == device].iloc[0]
+
+
+def graph_device_lookup(graph, zones: dict):
+    """The interned-graph attribute lookup generate_graphviz_code now uses."""
+    for zone_dict in zones.values():
+        for node_ids in zone_dict.values():
+            for node_id in node_ids:
+                graph.attr(node_id, 'model')
+
+
+def make_raw_export(row_count: int, seed: int = 0) -> pd.DataFrame:
+    """Builds an unsanitized 10-column export with the characters sanitize_input has to rewrite."""
+    rng = random.Random(seed)
+    dirty = ['Rack Room', 'IDF: 2/West', 'Core "A"', 'Port 5 -> Port 14', 'Closet {B}', 'Unit [3] | AV']
+    columns = ['Domotz Name', 'Location', 'Zone', 'Model', 'MAC', 'IP Address', 'Uplink',
+               'Source Port', 'Destination Port', 'Patch Panel']
+    return pd.DataFrame({col: [f"{rng.choice(dirty)} {i}" for i in range(row_count)] for col in columns}, dtype=str)
+
+
+def legacy_sanitize_input(input_str):
+    """The original 14-step str.replace chain, kept only for comparison."""
+    for old, new in netviz_v5.SANITIZE_REPLACEMENTS.items():
+        input_str = input_str.replace(old, new)
+    return input_str
+
+
+def legacy_sanitize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """The original per-cell apply over every column, kept only for comparison."""
+    for col in df.columns:
+        df[col] = df[col].fillna('Unknown')
+        df[col] = df[col].apply(lambda x: legacy_sanitize_input(str(x)))
+    return df
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def bench_emit(sizes, legacy_limit: int):
+    """Times full DOT emission, plus the device lookup alone for the indexed and legacy approaches."""
+    print(f"{'devices':>9} {'emit s':>9} {'us/dev':>8} {'index s':>9} {'legacy s':>9}")
+    for size in sizes:
+        df = make_topology(size)
+        graph = netviz_v5.graph_from_dataframe(df)
+        emit_s = timed(netviz_v5.generate_graphviz_code, graph, 'ARCH D', 'auto', 'ortho', 1)
+        index_s = timed(graph_device_lookup, graph, graph.clusters())
+        legacy = (f"{timed(legacy_device_lookup, df, netviz_v5.generate_zones_from_dataframe(df)):9.3f}"
+                  if size <= legacy_limit else f"{'skipped':>9}")
+        print(f"{size:>9} {emit_s:9.3f} {emit_s / size * 1e6:8.1f} {index_s:9.3f} {legacy}")
+
+
+def bench_sanitize(sizes):
+    """Times the vectorized sanitize_dataframe against the legacy per-cell path and checks they agree."""
+    print(f"{'rows':>9} {'legacy s':>9} {'vector s':>9} {'speedup':>8}")
+    for size in sizes:
+        raw = make_raw_export(size)
+        legacy_s = timed(legacy_sanitize_dataframe, raw.copy())
+        vector_s = timed(netviz_v5.sanitize_dataframe, raw.copy())
+        expected = legacy_sanitize_dataframe(raw.copy())[netviz_v5.SANITIZED_COLUMNS]
+        if not netviz_v5.sanitize_dataframe(raw.copy())[netviz_v5.SANITIZED_COLUMNS].equals(expected):
+            raise SystemExit(f"sanitize_dataframe disagrees with the legacy path at {size} rows")
+        print(f"{size:>9} {legacy_s:9.3f} {vector_s:9.3f} {legacy_s / vector_s:7.1f}x")
+
+
+# Stages reported by the suite, in pipeline order
+STAGES = ['load', 'sanitize', 'group', 'emit', 'render']
+
+
+def pandas_stages(module, path: str) -> list:
+    """Stages of the DataFrame-based variants: read_csv_data, generate_zones_from_dataframe, generate_graphviz_code."""
+    return [
+        ('load', lambda _: module.read_csv_data(path)),
+        ('group', lambda df: (df, module.generate_zones_from_dataframe(df))),
+        ('emit', lambda state: module.generate_graphviz_code(*state)),
+    ]
+
+
+def v5_stages(module, path: str) -> list:
+    """netviz_v5's stdlib path, with sanitization split out of loading."""
+    return [
+        ('load', lambda _: module.read_csv_columns(path)),
+        ('sanitize', lambda state: ({col: module.sanitize_column(values) for col, values in state[0].items()}, state[1])),
+        ('group', lambda state: module.graph_from_columns(*state)),
+        ('emit', lambda graph: module.generate_graphviz_code(graph, 'ARCH D', 'auto', 'ortho', 1)),
+    ]
+
+
+def chunked_stages(module, path: str) -> list:
+    """netviz_v5's chunked loader, which parses, sanitizes and groups one chunk of rows at a time."""
+    return [
+        ('group', lambda _: module.read_chunked_graph(path)),
+        ('emit', lambda graph: module.generate_graphviz_code(graph, 'ARCH D', 'auto', 'ortho', 1)),
+    ]
+
+
+def fused_stages(module, path: str) -> list:
+    """topogenerator does everything in one function, so it only has an emit stage."""
+    return [('emit', lambda _: module.generate_graphviz_code_from_csv(path))]
+
+
+def sheet_stages(module, path: str) -> list:
+    """Port-sheet readers stream each device section from the file straight to DOT, so reading and emitting are one stage."""
+    def emit(_):
+        with contextlib.redirect_stdout(io.StringIO()) as sink:
+            module.generateGraphviz(path, "asdf12340000", "MX75", "DE:AD:FA:CE:69:69", 24)
+        return sink.getvalue()
+
+    return [('emit', emit)]
+
+
+# Variant -> (module, input kind, stage builder, what the stage split can't show)
+SUITE_VARIANTS = {
+    'netviz_v1': ('netviz_v1', 'csv', pandas_stages, None),
+    'netviz_v2': ('netviz_v2', 'csv', pandas_stages, None),
+    'netviz_v3': ('netviz_v3', 'csv', pandas_stages, None),
+    'netviz_v4': ('netviz_v4', 'csv', pandas_stages, "sanitize runs inside load"),
+    'netviz_v5': ('netviz_v5', 'csv', v5_stages, None),
+    'netviz_v5_chunked': ('netviz_v5', 'csv', chunked_stages, "load and sanitize run inside group, a chunk at a time"),
+    'topogenerator': ('topogenerator', 'csv', fused_stages, "load, group and emit are one function"),
+    'topogen3': ('topgen3', 'csv', pandas_stages, None),
+    'topogenv2': ('topogenv2', 'csv', pandas_stages, None),
+    'read_proc': ('read_proc', 'proc', sheet_stages, "load runs inside emit, a device section at a time"),
+    'read_nax': ('read_nax', 'nax', sheet_stages, "load runs inside emit, a device section at a time"),
+    'read_whole_section': ('read_whole_section', 'section', sheet_stages, "load runs inside emit, a device section at a time"),
+}
+
+
+def run_stages(stages: list, trace_memory: bool) -> dict:
+    """Runs stages in order, feeding each the previous stage's output, and measures each one."""
+    measurements = {}
+    value = None
+    for name, stage in stages:
+        if trace_memory:
+            tracemalloc.start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            value = stage(value)
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+            if trace_memory:
+                tracemalloc.stop()
+        measurements[name] = {'wall_s': wall, 'cpu_s': cpu, 'peak_kib': peak / 1024 if peak is not None else None,
+                              'output_bytes': len(value) if isinstance(value, (str, bytes)) else None}
+    return measurements
+
+
+def bench_variant(module, builder, path: str, repeat: int, render: bool) -> dict:
+    """Times every stage (fastest of `repeat` runs), then runs once more under tracemalloc for peak memory."""
+    stages = builder(module, path)
+    if render:
+        from netviz_render import render_dot
+        stages.append(('render', lambda dot_text: render_dot(dot_text.encode('utf-8'), 'svg', 'dot', 'subprocess')))
+    best = {}
+    for _ in range(repeat):
+        for name, measured in run_stages(stages, trace_memory=False).items():
+            if name not in best or measured['wall_s'] < best[name]['wall_s']:
+                best[name] = measured
+    for name, measured in run_stages(stages, trace_memory=True).items():
+        best[name]['peak_kib'] = measured['peak_kib']
+    return best
+
+
+def bench_suite(args):
+    """Benchmarks every importable variant on seeded synthetic inputs and writes the results as JSON."""
+    sys.path.insert(0, REPO_DIR)  # netviz_v1 lives at the top of the repo
+    if args.render and not shutil.which('dot'):
+        print("dot not found on PATH; skipping the render stage", file=sys.stderr)
+        args.render = False
+
+    modules, skipped = {}, {}
+    for variant in args.variants:
+        module_name = SUITE_VARIANTS[variant][0]
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                modules[variant] = importlib.import_module(module_name)
+        except ImportError as e:
+            skipped[variant] = f"{type(e).__name__}: {e}"
+            print(f"skipping {variant}: {e}", file=sys.stderr)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='netviz-bench-') as workdir:
+        inputs = []
+        for size in args.devices:
+            path = os.path.join(workdir, f"topology_{size}.csv")
+            synth_topology.write_topology_csv(path, synth_topology.make_topology_rows(
+                size, args.locations, args.zones, args.fan_out, args.port_density, args.seed))
+            inputs.append(('csv', size, path))
+        for ports in args.ports:
+            for kind in synth_topology.SHEET_KINDS:
+                path = os.path.join(workdir, f"{kind}_{ports}.txt")
+                synth_topology.write_port_sheet(path, synth_topology.make_rack_sheet(kind, args.sheet_devices, ports,
+                                                                                     args.port_density, args.seed))
+                inputs.append((kind, ports, path))
+
+        print(f"{'variant':<20} {'size':>7} " + ' '.join(f"{stage:>9}" for stage in STAGES) + f" {'peak MiB':>9}")
+        for variant, module in modules.items():
+            _, kind, builder, note = SUITE_VARIANTS[variant]
+            for input_kind, size, path in inputs:
+                if input_kind != kind:
+                    continue
+                result = {'variant': variant, 'input': input_kind, 'size': size, 'note': note, 'stages': {}, 'error': None}
+                try:
+                    result['stages'] = bench_variant(module, builder, path, args.repeat, args.render)
+                except BaseException as e:  # sheet readers sys.exit() on bad input; keep going with the rest
+                    if isinstance(e, KeyboardInterrupt):
+                        raise
+                    result['error'] = f"{type(e).__name__}: {e}"
+                results.append(result)
+                stages = result['stages']
+                cells = ' '.join(f"{stages[stage]['wall_s']:9.4f}" if stage in stages else f"{'-':>9}" for stage in STAGES)
+                peak = max((measured['peak_kib'] or 0 for measured in stages.values()), default=0) / 1024
+                print(f"{variant:<20} {size:>7} {cells} {peak:9.1f}" + (f"  {result['error']}" if result['error'] else ''))
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {key: getattr(args, key) for key in ('devices', 'ports', 'sheet_devices', 'locations', 'zones',
+                                                           'fan_out', 'port_density', 'seed', 'repeat', 'render')},
+        'skipped': skipped,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"##Results written to '{args.output}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the netviz_v5 pipeline on synthetic topologies.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    emit_parser = subparsers.add_parser('emit', help="Time DOT emission as the device count grows.")
+    emit_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000, 16000])
+    emit_parser.add_argument('--legacy-limit', type=int, default=4000,
+                             help="Largest size to also time with the old O(N^2) per-device scan.")
+
+    sanitize_parser = subparsers.add_parser('sanitize', help="Compare vectorized and per-cell sanitization.")
+    sanitize_parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+
+    suite_parser = subparsers.add_parser('suite', help="Time and memory-profile every variant stage by stage.")
+    suite_parser.add_argument('--devices', type=int, nargs='+', default=[1000, 10000], help="Topology CSV sizes.")
+    suite_parser.add_argument('--ports', type=int, nargs='+', default=[48, 480], help="Port-sheet sizes.")
+    suite_parser.add_argument('--sheet-devices', type=int, default=1, help="Devices per port sheet, one section each.")
+    suite_parser.add_argument('--locations', type=int, default=8)
+    suite_parser.add_argument('--zones', type=int, default=4, help="Zones per location.")
+    suite_parser.add_argument('--fan-out', type=int, default=24, help="Most devices one switch uplinks.")
+    suite_parser.add_argument('--port-density', type=float, default=0.8, help="Share of links and ports that are connected.")
+    suite_parser.add_argument('--seed', type=int, default=0)
+    suite_parser.add_argument('--repeat', type=int, default=3, help="Runs per input; the fastest is reported.")
+    suite_parser.add_argument('--render', action='store_true', help="Also time rendering each DOT with dot -Tsvg.")
+    suite_parser.add_argument('--variants', nargs='+', default=list(SUITE_VARIANTS), choices=list(SUITE_VARIANTS))
+    suite_parser.add_argument('-o', '--output', default='bench_results.json', help="Where to write the JSON results.")
+
+    args = parser.parse_args()
+    if args.command == 'emit':
+        bench_emit(args.sizes, args.legacy_limit)
+    elif args.command == 'sanitize':
+        bench_sanitize(args.sizes)
+    elif args.command == 'suite':
+        bench_suite(args)
+
+
+if __name__ == "__main__":
+    main()
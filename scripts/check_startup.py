@@ -0,0 +1,63 @@
+#checks the headless netviz_v5 cold start against an import-time budget
+#
+#python3 scripts/check_startup.py
+#use the above command in CI; it exits non-zero if the budget is blown or a GUI/pandas import sneaks back in
+#
+#measured on a headless run over scripts/_test.csv: ~35 ms of imports, ~10 ms of which is the interpreter itself
+
+import argparse
+import os
+import subprocess
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules a headless run on a small CSV must never import
+FORBIDDEN_MODULES = ['gooey', 'wx', 'pandas', 'numpy']
+
+DEFAULT_BUDGET_MS = 100
+
+
+def measure_imports(command: list) -> dict:
+    """Runs command under -X importtime and returns each top-level module's self time in microseconds."""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + command,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    self_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, module = line[len('import time:'):].split('|')
+        self_times[module.strip()] = int(self_us)
+    return self_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check netviz_v5's headless cold-start import time.")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help="Maximum total import time in milliseconds.")
+    parser.add_argument('--runs', type=int, default=5, help="Runs to take the fastest of, to smooth out a cold disk cache.")
+    parser.add_argument('--csv', default=os.path.join(SCRIPT_DIR, '_test.csv'), help="CSV to run the headless path on.")
+    args = parser.parse_args()
+
+    command = [os.path.join(SCRIPT_DIR, 'netviz_v5.py'), args.csv, '--stdout', '--loader', 'csv']
+    runs = [measure_imports(command) for _ in range(args.runs)]
+    fastest = min(runs, key=lambda self_times: sum(self_times.values()))
+    total_ms = sum(fastest.values()) / 1000
+
+    print(f"##Import time: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms, fastest of {args.runs})")
+    for module, self_us in sorted(fastest.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"    {self_us / 1000:7.2f} ms  {module}")
+
+    failures = []
+    leaked = sorted({module for module in fastest
+                     if module.split('.')[0] in FORBIDDEN_MODULES})
+    if leaked:
+        failures.append(f"headless run imported {', '.join(leaked)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
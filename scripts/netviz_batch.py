@@ -0,0 +1,158 @@
+#generates diagrams for a whole folder of topology CSVs and port sheets in one go
+#
+#python3 scripts/netviz_batch.py '/path/to/project/' --workers 4
+#python3 scripts/netviz_batch.py 'exports/*.csv' 'sheets/*.txt' --sheet-reader nax
+#use the above commands instead of looping over files in the shell; each file is parsed, emitted and
+#rendered in a worker process, and one bad file is reported without stopping the rest
+
+import argparse
+import contextlib
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import netviz_v5
+from render_cache import DEFAULT_CACHE_DIR, RenderCache, report
+
+# Extensions picked up when a directory is given
+CSV_EXTENSIONS = ('.csv', '.csv.gz', '.csv.zst')
+SHEET_EXTENSIONS = ('.tsv', '.txt')
+
+# Tab-delimited port-sheet readers, by module name; each prints DOT from generateGraphviz
+SHEET_READERS = {
+    'proc': ('read_proc', "MX75"),
+    'nax': ('read_nax', "PowerWand3000"),
+    'section': ('read_whole_section', "MX75"),
+}
+# Readers whose generateGraphviz writes to an explicit sink; the others have their stdout captured
+SINK_READERS = {'read_proc'}
+
+
+def collect_inputs(patterns: list) -> list:
+    """Expands directories and glob patterns into a sorted, de-duplicated list of input files."""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for name in os.listdir(pattern):
+                if name.lower().endswith(CSV_EXTENSIONS + SHEET_EXTENSIONS):
+                    paths.add(os.path.join(pattern, name))
+        else:
+            matches = glob.glob(pattern)
+            paths.update(matches if matches else [pattern])
+    return sorted(paths)
+
+
+def output_stems(paths: list) -> dict:
+    """Maps each input to the name its outputs get: its stem ('site.csv' -> 'site'), or the whole path when another
+    input shares that stem ('site.csv' and 'site.txt' -> 'site.csv' and 'site.txt'), so no two jobs write one file."""
+    stems = {path: netviz_v5.input_stem(path) for path in paths}
+    taken = {}
+    for stem in stems.values():
+        taken[stem.lower()] = taken.get(stem.lower(), 0) + 1  # case-insensitive filesystems collide too
+    return {path: stem if taken[stem.lower()] == 1 else path for path, stem in stems.items()}
+
+
+def emit_csv(csv_file: str, dot_file: str, options: dict):
+    """Loads a topology CSV and streams its DOT code to dot_file."""
+    graph, _ = netviz_v5.load_normalized_topology(csv_file, options['loader'], options['keep_duplicates'])
+    with open(dot_file, "w") as sink:
+        netviz_v5.write_graphviz_code(sink, graph, options['paper_size'], options['ratio'],
+                                      options['splines'], options['ranksep'])
+
+
+def emit_sheet(sheet_file: str, dot_file: str, options: dict):
+    """Runs a port-sheet reader on sheet_file, capturing what it prints into dot_file."""
+    import importlib
+    module_name, device_model = SHEET_READERS[options['sheet_reader']]
+    reader = importlib.import_module(module_name)
+    with open(dot_file, "w") as sink:
+        if module_name in SINK_READERS:
+            reader.generateGraphviz(sheet_file, "asdf12340000", device_model, "DE:AD:FA:CE:69:69", 24, sink=sink)
+        else:
+            with contextlib.redirect_stdout(sink):
+                reader.generateGraphviz(sheet_file, "asdf12340000", device_model, "DE:AD:FA:CE:69:69", 24)
+
+
+def process_file(path: str, options: dict, stem: str = None) -> tuple:
+    """Parses, emits and optionally renders one input to <stem>.dot (and .svg); returns (path, outputs, error, cache_hit)
+    and never raises. stem defaults to the input's name without its extension."""
+    dot_file = f"{stem or netviz_v5.input_stem(path)}.dot"
+    # Emitted next to the output and renamed over it only once complete, so a failure never leaves half a DOT
+    tmp_file = f"{dot_file}.{os.getpid()}.tmp"
+    cache = RenderCache(options['cache_dir']) if options['cache_dir'] else None
+    try:
+        if path.lower().endswith(CSV_EXTENSIONS):
+            emit_csv(path, tmp_file, options)
+        else:
+            emit_sheet(path, tmp_file, options)
+        os.replace(tmp_file, dot_file)
+        outputs = [dot_file]
+        if options['svg']:
+            outputs.append(netviz_v5.render_svg(dot_file, cache, options['renderer']))
+        return path, outputs, None, bool(cache and cache.hits)
+    except BaseException as e:  # readers call sys.exit() on bad input; report it like any other failure
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_file)
+        stderr = getattr(e, 'stderr', None)
+        detail = stderr.decode('utf-8', 'replace').strip() if isinstance(stderr, bytes) and stderr else str(e)
+        return path, [], f"{type(e).__name__}: {detail}", False
+
+
+def run_batch(paths: list, options: dict, workers: int = None) -> list:
+    """Processes every path across a pool of worker processes and returns the results in input order."""
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        stems = output_stems(paths)
+        futures = {pool.submit(process_file, path, options, stems[path]): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+            except Exception as e:  # the worker itself died, e.g. BrokenProcessPool
+                results[path] = (path, [], f"{type(e).__name__}: {e}", False)
+            _, outputs, error, cache_hit = results[path]
+            if error:
+                print(f"FAILED {path}: {error}", file=sys.stderr)
+            else:
+                print(f"{'CACHED' if cache_hit else 'OK    '} {path} -> {', '.join(outputs)}")
+    return [results[path] for path in paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate diagrams for many topology CSVs and port sheets in parallel.")
+    parser.add_argument('inputs', nargs='+', help="Files, directories or glob patterns of .csv(.gz/.zst)/.tsv/.txt inputs.")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Worker processes (default: one per CPU).")
+    parser.add_argument('--no-svg', dest='svg', action='store_false', help="Only write DOT files, skip rendering.")
+    parser.add_argument('--renderer', default='auto', choices=['auto', 'inprocess', 'subprocess'],
+                        help="Render in-process through pygraphviz or by running dot; 'auto' prefers in-process.")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Directory of the SVG render cache.")
+    parser.add_argument('--no-cache', dest='cache_dir', action='store_const', const=None,
+                        help="Always re-run dot, even for diagrams rendered before.")
+    parser.add_argument('--sheet-reader', default='proc', choices=sorted(SHEET_READERS),
+                        help="Reader used for tab-delimited port sheets.")
+    parser.add_argument('-p', '--paper_size', default='ARCH D', choices=['11x17', 'ARCH A', 'ARCH B', 'ARCH C', 'ARCH D', 'ARCH E1', 'ARCH E'])
+    parser.add_argument('-r', '--ratio', default='auto', choices=['fill', 'auto'])
+    parser.add_argument('--splines', default='ortho', choices=['ortho', 'curved'])
+    parser.add_argument('--ranksep', default=1)
+    parser.add_argument('--loader', default='auto', choices=['auto', 'csv', 'pandas', 'chunked'])
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help="Emit every row and link as listed instead of merging repeated devices and parallel links.")
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        print("No input files found.", file=sys.stderr)
+        sys.exit(1)
+
+    options = {key: getattr(args, key) for key in ('svg', 'renderer', 'cache_dir', 'sheet_reader', 'paper_size', 'ratio', 'splines', 'ranksep', 'loader', 'keep_duplicates')}
+    results = run_batch(paths, options, args.workers)
+    failed = [path for path, _, error, _ in results if error]
+    print(f"##Processed {len(results)} files: {len(results) - len(failed)} ok, {len(failed)} failed")
+    if args.svg and args.cache_dir:
+        report(RenderCache(args.cache_dir), [(cache_hit, error) for _, _, error, cache_hit in results])
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
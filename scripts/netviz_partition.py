@@ -0,0 +1,152 @@
+#splits one site diagram into a diagram per Location (or Location/Zone) plus an overview and an HTML index
+#
+#python3 scripts/netviz_v5.py campus.csv -s --partition-by Location
+#use the above command when a single campus-wide diagram takes too long to lay out; uplinks that leave a
+#partition end at a dashed stub node linking to the partition the other device lives in
+
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import netviz_v5
+from netviz_render import render_job
+from topo_model import TopologyGraph
+
+# Grouping columns a topology can be partitioned by, and how a device row's clusters map to its partition
+PARTITION_KEYS = {
+    'Location': lambda location, zone: location,
+    'Zone': lambda location, zone: f"{location}_{zone}",
+}
+
+
+class Partition:
+    """The devices and uplinks of one sub-diagram, plus stubs for devices in other partitions."""
+    __slots__ = ('name', 'graph', 'stubs')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.graph = TopologyGraph()
+        self.stubs = {}  # remote device name -> partition it lives in
+
+
+def partition_topology(graph: TopologyGraph, partition_by: str = 'Location') -> dict:
+    """Splits the graph by partition; a link goes to every partition it touches, with the far end as a stub."""
+    key = PARTITION_KEYS[partition_by]
+    strings = graph.pool.strings
+    partitions = {}
+    home = {}
+    for node_id, location, zone in zip(graph.rows, graph.row_clusters['location'], graph.row_clusters['zone']):
+        location, zone = strings[location], strings[zone]
+        name = key(location, zone)
+        partition = partitions.get(name) or partitions.setdefault(name, Partition(name))
+        partition.graph.add_device(graph.name(node_id), location=location, zone=zone, model=graph.attr(node_id, 'model'),
+                                   mac=graph.attr(node_id, 'mac'), ip=graph.attr(node_id, 'ip'))
+        home.setdefault(node_id, name)
+
+    for edge_id, source, target in graph.edges():
+        source_home = home.get(source)
+        target_home = home.get(target)
+        if source_home is None:
+            continue
+        link = (graph.name(source), graph.name(target))
+        ports = {field: graph.edge_attr(edge_id, field) for field in graph.edge_fields}
+        partitions[source_home].graph.add_edge(*link, **ports)
+        if target_home is not None and target_home != source_home:
+            partitions[source_home].stubs[link[1]] = target_home
+            partitions[target_home].graph.add_edge(*link, **ports)
+            partitions[target_home].stubs[link[0]] = source_home
+    return partitions
+
+
+def plural(count: int, noun: str) -> str:
+    return f"{count} {noun}{'' if count == 1 else 's'}"
+
+
+def partition_filename(base_filename: str, partition_name: str, extension: str) -> str:
+    return os.path.join(f"{base_filename}_partitions", f"{netviz_v5.sanitize_input(partition_name)}.{extension}")
+
+
+def iter_partition_code(partition: Partition, base_filename: str, graph_options: tuple):
+    """Yields the DOT for one partition: its clusters, stub nodes for remote uplinks, and its edges."""
+    paper_size, ratio, splines, ranksep, colors = graph_options
+    yield from netviz_v5.iter_graph_header(paper_size, ratio, splines, ranksep)
+    for location, zone_dict in partition.graph.clusters().items():
+        yield from netviz_v5.iter_location_cluster(location, zone_dict, partition.graph, colors)
+    for device, remote in partition.stubs.items():
+        target = os.path.basename(partition_filename(base_filename, remote, 'svg'))
+        device_label, remote_label = netviz_v5.escape_dot(device), netviz_v5.escape_dot(remote)
+        yield (f'    {netviz_v5.quote_id(device)} [label="{device_label}\\n({remote_label})", style="dashed,rounded", '
+               f'fillcolor=white, URL="{netviz_v5.escape_dot(target)}", tooltip="Open {remote_label}"];\n')
+    yield from netviz_v5.iter_edges(partition.graph)
+    yield '}\n'
+
+
+def iter_overview_code(partitions: dict, base_filename: str, graph_options: tuple):
+    """Yields a DOT overview with one node per partition and one edge per pair of connected partitions."""
+    paper_size, ratio, splines, ranksep, colors = graph_options
+    yield from netviz_v5.iter_graph_header(paper_size, ratio, splines, ranksep)
+    for name, partition in partitions.items():
+        target = os.path.join(os.path.basename(f"{base_filename}_partitions"),
+                              os.path.basename(partition_filename(base_filename, name, 'svg')))
+        yield (f'    {netviz_v5.quote_id(name)} [label="{netviz_v5.escape_dot(name)}\\n{plural(partition.graph.device_count, "device")}", '
+               f'style="filled,rounded", fillcolor="{colors(name)}", URL="{netviz_v5.escape_dot(target)}"];\n')
+    uplinks = {}
+    for name, partition in partitions.items():
+        for _, _, target in partition.graph.edges():
+            remote = partition.stubs.get(partition.graph.name(target))
+            if remote:
+                uplinks[name, remote] = uplinks.get((name, remote), 0) + 1
+    for (source, target), count in uplinks.items():
+        yield f'    {netviz_v5.quote_id(source)} -> {netviz_v5.quote_id(target)} [label="{plural(count, "uplink")}"];\n'
+    yield '}\n'
+
+
+def write_index(index_file: str, overview_svg: str, partitions: dict, base_filename: str):
+    """Writes an HTML page that shows the overview and links to every partition's SVG."""
+    index_dir = os.path.dirname(os.path.abspath(index_file))
+    rows = []
+    for name, partition in partitions.items():
+        target = os.path.relpath(partition_filename(base_filename, name, 'svg'), index_dir)
+        rows.append(f'    <li><a href="{html.escape(target)}">{html.escape(name)}</a> ({plural(partition.graph.device_count, "device")})</li>\n')
+    overview = os.path.relpath(overview_svg, index_dir)
+    with open(index_file, 'w') as f:
+        f.write(f'<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"><title>{html.escape(os.path.basename(base_filename))}</title></head>\n'
+                f'<body>\n  <h1>{html.escape(os.path.basename(base_filename))}</h1>\n'
+                f'  <object data="{html.escape(overview)}" type="image/svg+xml"></object>\n  <ul>\n'
+                + ''.join(rows) + '  </ul>\n</body>\n</html>\n')
+
+
+def run_partitioned(args, graph: TopologyGraph, colors):
+    """Writes a DOT per partition plus an overview; with -s renders them all in parallel and writes an index page."""
+    base_filename = netviz_v5.input_stem(args.csv_file)
+    graph_options = (args.paper_size, args.ratio, args.splines, args.ranksep, colors)
+    partitions = partition_topology(graph, args.partition_by)
+    os.makedirs(f"{base_filename}_partitions", exist_ok=True)
+
+    jobs = [(''.join(iter_overview_code(partitions, base_filename, graph_options)), f"{base_filename}_overview")]
+    for name, partition in partitions.items():
+        jobs.append((''.join(iter_partition_code(partition, base_filename, graph_options)),
+                     os.path.splitext(partition_filename(base_filename, name, 'dot'))[0]))
+    if args.dot or not args.svg:
+        for dot_text, stem in jobs:
+            with open(f"{stem}.dot", "w") as dot_file:
+                dot_file.write(dot_text)
+    print(f"##Partitioned by {args.partition_by}: {len(partitions)} diagrams plus overview")
+
+    if args.svg:
+        cache = netviz_v5.open_render_cache(args)
+        cache_dir = cache.directory if cache else None
+        with ProcessPoolExecutor() as pool:
+            results = list(pool.map(render_job, [dot_text for dot_text, _ in jobs], [f"{stem}.svg" for _, stem in jobs],
+                                    [cache_dir] * len(jobs), [args.renderer] * len(jobs)))
+        for svg_file, cache_hit, error in results:
+            if error:
+                print(f"Error generating SVG '{svg_file}': {error}")
+            else:
+                print(f"SVG file '{svg_file}' generated{' (cached)' if cache_hit else ''}.")
+        index_file = f"{base_filename}_index.html"
+        write_index(index_file, f"{base_filename}_overview.svg", partitions, base_filename)
+        print(f"Index '{index_file}' written.")
+        if cache is not None:
+            from render_cache import report
+            report(cache, [(cache_hit, error) for _, cache_hit, error in results])
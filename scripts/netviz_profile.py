@@ -0,0 +1,115 @@
+#per-stage wall/CPU timings and counters for a single netviz run
+#
+#python3 scripts/netviz_v5.py AHT-Topo.CSV -s --profile
+#python3 scripts/netviz_v5.py AHT-Topo.CSV -s --profile-json run.json
+#use the above commands when a run is slow to see whether the time goes to parsing, sanitizing, grouping,
+#emission or dot; without either flag every hook is a no-op on NULL_PROFILER
+
+import time
+
+
+class _Stage:
+    """Context manager that records one stage's wall and CPU time; stages are listed in the order they start."""
+    __slots__ = ('profiler', 'record', 'wall', 'cpu')
+
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.record = {'stage': name, 'depth': 0, 'wall_s': None, 'cpu_s': None}
+
+    def __enter__(self):
+        self.record['depth'] = self.profiler._depth
+        self.profiler._depth += 1
+        self.profiler.stages.append(self.record)
+        self.wall, self.cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.record['wall_s'] = time.perf_counter() - self.wall
+        self.record['cpu_s'] = time.process_time() - self.cpu
+        self.profiler._depth -= 1
+        return False
+
+
+class _CountingSink:
+    """Wraps a text sink and adds the UTF-8 size of everything written to a counter."""
+
+    def __init__(self, sink, profiler, counter: str):
+        self.sink = sink
+        self.profiler = profiler
+        self.counter = counter
+
+    def write(self, text: str):
+        self.profiler.count(self.counter, len(text.encode('utf-8')))
+        return self.sink.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.sink, name)
+
+
+class Profiler:
+    """Collects nested stage timings and named counters, and reports them as a text summary or JSON."""
+    enabled = True
+
+    def __init__(self):
+        self.stages = []
+        self.counters = {}
+        self._depth = 0
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def counting_sink(self, sink, counter: str = 'dot_bytes'):
+        """Returns sink wrapped so that what is written through it is counted under counter."""
+        return _CountingSink(sink, self, counter)
+
+    def counting_statements(self, statements, counter: str = 'dot_bytes'):
+        """Yields statements unchanged while counting their UTF-8 size under counter."""
+        for statement in statements:
+            self.count(counter, len(statement.encode('utf-8')))
+            yield statement
+
+    def report(self) -> dict:
+        return {'stages': self.stages, 'counters': self.counters}
+
+    def summary(self) -> str:
+        lines = ["##Profile", f"    {'stage':<24} {'wall ms':>10} {'cpu ms':>10}"]
+        for stage in self.stages:
+            name = '  ' * stage['depth'] + stage['stage']
+            lines.append(f"    {name:<24} {stage['wall_s'] * 1000:10.1f} {stage['cpu_s'] * 1000:10.1f}")
+        if self.counters:
+            lines.append('    ' + ', '.join(f"{name}={value}" for name, value in self.counters.items()))
+        return '\n'.join(lines)
+
+    def write_json(self, path: str):
+        import json
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every hook returns immediately and records nothing."""
+    enabled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def stage(self, name: str):
+        return self
+
+    def count(self, name: str, value: int = 1):
+        pass
+
+    def counting_sink(self, sink, counter: str = 'dot_bytes'):
+        return sink
+
+    def counting_statements(self, statements, counter: str = 'dot_bytes'):
+        return statements
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,181 @@
+#renders only part of a topology: the neighborhood of a device, its path to the Internet, or one Location/Zone
+#
+#python3 scripts/netviz_v5.py campus.csv -s --around Closet3-SW1 --hops 2
+#python3 scripts/netviz_v5.py campus.csv -s --upstream Lobby-AP2
+#python3 scripts/netviz_v5.py campus.csv -s --location North_Hall --zone Closet_3
+#use the above commands to debug one closet without laying out the whole site; queries are answered from an
+#adjacency index over Domotz Name -> Uplink built once per load, so extracting and laying out the result costs
+#time in proportion to the result, not to the fleet. Filters combine: --location with --around keeps the
+#neighborhood's devices that are in that Location
+
+import bisect
+import functools
+from collections import deque
+
+import netviz_v5
+from topo_model import TopologyGraph
+
+
+class GroupedPositions:
+    """The positions of a column grouped by value, as two sorted lists rather than a dict of lists per value.
+
+    Built with two sorts that run in C, so grouping a fleet's links by device stays cheap however many devices
+    there are; a lookup is two bisections.
+    """
+
+    def __init__(self, column):
+        self.order = sorted(range(len(column)), key=column.__getitem__)  # stable, so positions stay ascending
+        self.values = sorted(column)
+
+    def get(self, value: int, default=()) -> list:
+        """Returns the positions holding value in ascending order, or default if there are none."""
+        start = bisect.bisect_left(self.values, value)
+        end = bisect.bisect_right(self.values, value, start)
+        return self.order[start:end] if end > start else default
+
+
+class AdjacencyIndex:
+    """Uplinks, downlinks, device rows and cluster rows of a topology graph, by node id and by cluster name.
+
+    Each table is built on first use, so a Location filter never pays for the link tables and vice versa.
+    """
+
+    def __init__(self, graph: TopologyGraph):
+        self.graph = graph
+
+    @functools.cached_property
+    def uplinks(self) -> GroupedPositions:
+        """node id -> edge ids of the links it uplinks through (Domotz Name -> Uplink)."""
+        return GroupedPositions(self.graph.edge_sources)
+
+    @functools.cached_property
+    def downlinks(self) -> GroupedPositions:
+        """node id -> edge ids of the links uplinking to it."""
+        return GroupedPositions(self.graph.edge_targets)
+
+    @functools.cached_property
+    def node_rows(self) -> GroupedPositions:
+        """node id -> its device rows."""
+        return GroupedPositions(self.graph.rows)
+
+    @functools.cached_property
+    def cluster_rows(self) -> dict:
+        """location -> [device row, ...] and (location, zone) -> [device row, ...]."""
+        graph = self.graph
+        strings = graph.pool.strings
+        outer_field, inner_field = graph.cluster_fields
+        by_ids = {}
+        for row, clusters in enumerate(zip(graph.row_clusters[outer_field], graph.row_clusters[inner_field])):
+            by_ids.setdefault(clusters, []).append(row)
+        # Keyed by pool ids while scanning, so only the distinct clusters are looked up as strings
+        cluster_rows = {}
+        for (outer, inner), rows in by_ids.items():
+            cluster_rows.setdefault(strings[outer], []).extend(rows)
+            cluster_rows[(strings[outer], strings[inner])] = rows
+        return cluster_rows
+
+    def node(self, name: str) -> int:
+        """Returns the node id of a device name as typed (it is sanitized like the CSV was); raises ValueError if unknown."""
+        node_id = self.graph.node_ids.get(netviz_v5.sanitize_input(name))
+        if node_id is None:
+            raise ValueError(f"no device named '{name}'")
+        return node_id
+
+    def neighborhood(self, node_id: int, hops: int) -> list:
+        """Returns the nodes within `hops` links of node_id, following uplinks and downlinks, in the order reached.
+
+        Link ends that aren't devices (Internet, Unknown) are reached but not passed through, as every device
+        without a known uplink shares them.
+        """
+        sources, targets, described = self.graph.edge_sources, self.graph.edge_targets, self.graph.described
+        reached = {node_id: 0}
+        queue = deque([node_id])
+        while queue:
+            current = queue.popleft()
+            if reached[current] == hops or (current != node_id and not described[current]):
+                continue
+            neighbors = ([targets[edge_id] for edge_id in self.uplinks.get(current, ())]
+                         + [sources[edge_id] for edge_id in self.downlinks.get(current, ())])
+            for neighbor in neighbors:
+                if neighbor not in reached:
+                    reached[neighbor] = reached[current] + 1
+                    queue.append(neighbor)
+        return list(reached)
+
+    def upstream(self, node_id: int) -> list:
+        """Returns the shortest chain of uplinks from node_id to Internet, or every upstream node if none reaches it."""
+        targets, names = self.graph.edge_targets, self.graph.name
+        parents = {node_id: None}
+        queue = deque([node_id])
+        while queue:
+            current = queue.popleft()
+            if names(current) == 'Internet':
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                return path[::-1]
+            for edge_id in self.uplinks.get(current, ()):
+                if targets[edge_id] not in parents:
+                    parents[targets[edge_id]] = current
+                    queue.append(targets[edge_id])
+        return list(parents)
+
+    def cluster(self, location: str, zone: str = None) -> list:
+        """Returns the device rows of a Location, or of one Zone in it, as typed; raises ValueError if there are none."""
+        key = netviz_v5.sanitize_input(location)
+        if zone is not None:
+            key = (key, netviz_v5.sanitize_input(zone))
+        rows = self.cluster_rows.get(key)
+        if rows is None:
+            raise ValueError(f"no devices in {'/'.join([location] + ([zone] if zone is not None else []))}")
+        return rows
+
+
+def subgraph(index: AdjacencyIndex, rows: list, node_ids: set) -> TopologyGraph:
+    """Copies the given device rows and the links among node_ids into a new graph, keeping the original order."""
+    graph = index.graph
+    strings = graph.pool.strings
+    result = TopologyGraph(graph.node_fields, graph.cluster_fields, graph.edge_fields)
+    for row in sorted(rows):
+        node_id = graph.rows[row]
+        attrs = {field: graph.attr(node_id, field) for field in graph.node_fields}
+        attrs.update((field, strings[values[row]]) for field, values in graph.row_clusters.items())
+        result.add_device(graph.name(node_id), **attrs)
+    edge_ids = sorted(edge_id for node_id in node_ids for edge_id in index.uplinks.get(node_id, ())
+                      if graph.edge_targets[edge_id] in node_ids)
+    for edge_id in edge_ids:
+        result.add_edge(graph.name(graph.edge_sources[edge_id]), graph.name(graph.edge_targets[edge_id]),
+                        **{field: graph.edge_attr(edge_id, field) for field in graph.edge_fields})
+    for node_id in node_ids:
+        if node_id in graph.port_groups:
+            result.port_groups[result.node(graph.name(node_id))] = graph.port_groups[node_id]
+    return result
+
+
+def query_topology(graph: TopologyGraph, args, index: AdjacencyIndex = None) -> TopologyGraph:
+    """Returns the part of graph selected by --around/--hops, --upstream, --location and --zone.
+
+    index may be passed in when several queries run over the same graph; raises ValueError for unknown names.
+    """
+    index = index or AdjacencyIndex(graph)
+    if args.zone is not None and args.location is None:
+        raise ValueError("--zone needs --location")
+    if args.around is not None and args.hops < 0:
+        raise ValueError("--hops can't be negative")
+    node_ids = None
+    if args.around is not None:
+        node_ids = set(index.neighborhood(index.node(args.around), args.hops))
+    if args.upstream is not None:
+        path = set(index.upstream(index.node(args.upstream)))
+        node_ids = path if node_ids is None else node_ids & path
+
+    if args.location is not None:
+        rows = index.cluster(args.location, args.zone)
+        if node_ids is not None:
+            rows = [row for row in rows if graph.rows[row] in node_ids]
+        node_ids = {graph.rows[row] for row in rows}
+    else:
+        # Link ends without rows of their own (Internet, Unknown) stay in node_ids, so links to them are kept
+        rows = [row for node_id in node_ids for row in index.node_rows.get(node_id, ())]
+    return subgraph(index, rows, node_ids)
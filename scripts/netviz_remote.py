@@ -0,0 +1,181 @@
+#fetches topology CSVs from Google Sheets and regenerates their diagrams only when a sheet has changed
+#
+#python3 scripts/netviz_remote.py 1O96t52IudOEeXs3DyJCMo1sYNqlL9GTBOjKDURbcHbY --out-dir diagrams
+#python3 scripts/netviz_remote.py --url-template 'http://127.0.0.1:8765/{sheet_id}.csv' AHT-Topo
+#each sheet's CSV export is kept in a local cache with its ETag/Last-Modified and revalidated with a
+#conditional GET; on a 304 the sheet isn't parsed or rendered at all. Many sheets are fetched at once on a
+#bounded thread pool, then only the changed ones go through netviz_batch. sheet_server.py stands in for Google offline
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from render_cache import atomic_write, cache_root
+
+SHEET_URL_TEMPLATE = "https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+DEFAULT_CACHE_DIR = cache_root('remote')
+DEFAULT_FETCH_WORKERS = 8
+FETCH_TIMEOUT = 30
+
+
+class SheetCache:
+    """Fetched sheet bodies and the validators to revalidate them with, as <key>.csv and <key>.json per URL."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def body_path(self, url: str) -> str:
+        return os.path.join(self.directory, f"{self._key(url)}.csv")
+
+    def validators(self, url: str) -> dict:
+        """Returns the stored ETag/Last-Modified/hash for url, or {} when nothing usable is cached."""
+        meta_path = os.path.join(self.directory, f"{self._key(url)}.json")
+        if not os.path.isfile(self.body_path(url)) or not os.path.isfile(meta_path):
+            return {}
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):  # a torn write from an interrupted run; fetch it again
+            return {}
+
+    def store(self, url: str, body: bytes, headers) -> bool:
+        """Saves a 200 response; returns False when the body is the same as the cached one (no validators in use).
+
+        A changed body is recorded as not yet regenerated until mark_regenerated is called for it.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        previous = self.validators(url)
+        changed = previous.get('sha256') != digest
+        meta = {'url': url, 'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified'),
+                'sha256': digest, 'fetched': time.time(), 'regenerated': not changed and previous.get('regenerated', True)}
+        if changed:
+            atomic_write(self.body_path(url), body)
+        self._write_meta(url, meta)
+        return changed
+
+    def regenerated(self, url: str) -> bool:
+        """True when the diagram of url's cached body was written successfully (entries from older runs count as written)."""
+        return self.validators(url).get('regenerated', True)
+
+    def mark_regenerated(self, url: str):
+        """Records that url's cached body made it into a diagram, so a 304 for it can be skipped from now on."""
+        meta = self.validators(url)
+        if meta and not meta.get('regenerated', True):
+            meta['regenerated'] = True
+            self._write_meta(url, meta)
+
+    def _write_meta(self, url: str, meta: dict):
+        atomic_write(os.path.join(self.directory, f"{self._key(url)}.json"), json.dumps(meta, indent=2).encode('utf-8'))
+
+
+def fetch_sheet(url: str, cache: SheetCache, timeout: float = FETCH_TIMEOUT) -> tuple:
+    """Fetches url, conditionally when it is cached; returns (cached body path, changed).
+
+    changed is False on a 304, and on a 200 whose body hashes the same as the cached copy.
+    """
+    meta = cache.validators(url)
+    request = urllib.request.Request(url)
+    if meta.get('etag'):
+        request.add_header('If-None-Match', meta['etag'])
+    if meta.get('last_modified'):
+        request.add_header('If-Modified-Since', meta['last_modified'])
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            headers = response.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and meta:
+            return cache.body_path(url), False
+        raise
+    return cache.body_path(url), cache.store(url, body, headers)
+
+
+def fetch_sheets(urls: list, cache: SheetCache, workers: int = DEFAULT_FETCH_WORKERS) -> list:
+    """Fetches every URL on at most `workers` threads; returns (body path, changed, error) per URL in order."""
+    def fetch(url):
+        try:
+            return (*fetch_sheet(url, cache), None)
+        except (OSError, ValueError) as e:  # URLError and HTTPError are OSErrors
+            return None, False, f"{type(e).__name__}: {e}"
+
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as pool:
+        return list(pool.map(fetch, urls))
+
+
+def sheet_url(source: str, url_template: str) -> tuple:
+    """Maps a sheet ID or a full URL to (name for its output files, URL to fetch)."""
+    if source.startswith(('http://', 'https://')):
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16], source
+    return source, url_template.format(sheet_id=source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch Google Sheets topologies and regenerate diagrams for the changed ones.")
+    parser.add_argument('sources', nargs='+', help="Sheet IDs, or full URLs of CSV exports.")
+    parser.add_argument('--url-template', default=SHEET_URL_TEMPLATE,
+                        help="URL a sheet ID is fetched from; point it at sheet_server.py to test offline.")
+    parser.add_argument('--out-dir', default='.', help="Where each sheet's <name>.csv, .dot and .svg are written.")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Cache of fetched sheets and their validators.")
+    parser.add_argument('--fetch-workers', type=int, default=DEFAULT_FETCH_WORKERS, help="Most sheets fetched at once.")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Worker processes for emitting and rendering.")
+    parser.add_argument('--force', action='store_true', help="Regenerate every diagram, even for unchanged sheets.")
+    parser.add_argument('--no-svg', dest='svg', action='store_false', help="Only write DOT files, skip rendering.")
+    parser.add_argument('--renderer', default='auto', choices=['auto', 'inprocess', 'subprocess'],
+                        help="Render in-process through pygraphviz or by running dot; 'auto' prefers in-process.")
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help="Emit every row and link as listed instead of merging repeated devices and parallel links.")
+    args = parser.parse_args()
+
+    from netviz_batch import run_batch
+    from render_cache import DEFAULT_CACHE_DIR as RENDER_CACHE_DIR
+
+    cache = SheetCache(args.cache_dir)
+    sources = [sheet_url(source, args.url_template) for source in args.sources]
+    fetched = fetch_sheets([url for _, url in sources], cache, args.fetch_workers)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    stale = {}  # csv file -> URL it was fetched from
+    unchanged = failed = 0
+    for (name, url), (body_path, changed, error) in zip(sources, fetched):
+        if error:
+            failed += 1
+            print(f"FAILED {name}: {error}", file=sys.stderr)
+            continue
+        csv_file = os.path.join(args.out_dir, f"{name}.csv")
+        output = f"{os.path.splitext(csv_file)[0]}.{'svg' if args.svg else 'dot'}"
+        # A sheet whose last regeneration failed is retried even on a 304, or its old diagram would stay forever
+        if (not changed and not args.force and cache.regenerated(url)
+                and os.path.isfile(csv_file) and os.path.isfile(output)):
+            print(f"UNCHANGED {name}")
+            unchanged += 1
+            continue
+        shutil.copyfile(body_path, csv_file)
+        stale[csv_file] = url
+
+    if stale:
+        options = {'svg': args.svg, 'renderer': args.renderer, 'cache_dir': RENDER_CACHE_DIR, 'sheet_reader': 'proc',
+                   'paper_size': 'ARCH D', 'ratio': 'auto', 'splines': 'ortho', 'ranksep': 1, 'loader': 'auto',
+                   'keep_duplicates': args.keep_duplicates}
+        for csv_file, _, error, _ in run_batch(list(stale), options, args.workers):
+            if error:
+                failed += 1
+            else:
+                cache.mark_regenerated(stale[csv_file])
+    print(f"##Fetched {len(sources)} sheets: {len(stale)} regenerated, {unchanged} unchanged, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
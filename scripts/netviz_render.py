@@ -0,0 +1,157 @@
+#renders DOT to SVG (or any Graphviz format) in memory, with the render cache in front
+#
+#the in-process backend binds libgraphviz through pygraphviz (`pip install pygraphviz`) and lays the graph
+#out without spawning dot or touching the filesystem; without it, DOT is piped to the dot executable instead
+
+import hashlib
+import re
+import subprocess
+import sys
+
+BACKENDS = ['auto', 'inprocess', 'subprocess']
+
+# The comment Graphviz puts at the top of every SVG it writes, e.g. "<!-- Generated by graphviz version 2.43.0 (0)"
+GENERATED_BY = re.compile(rb'Generated by graphviz version (\S+(?: \([^)]*\))?)')
+
+_versions = {}
+
+
+def inprocess_available() -> bool:
+    """True when pygraphviz, and so libgraphviz, can be imported."""
+    try:
+        import pygraphviz  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_backend(backend: str = 'auto') -> str:
+    """Maps 'auto' to 'inprocess' when the bindings are installed, else 'subprocess'; a missing binding falls back too."""
+    if backend in ('auto', 'inprocess') and inprocess_available():
+        return 'inprocess'
+    if backend == 'inprocess':
+        print("pygraphviz is not installed; rendering with the dot executable instead.", file=sys.stderr)
+    return 'subprocess'
+
+
+def svg_graphviz_version(svg: bytes) -> str:
+    """Returns the Graphviz version an SVG says it was generated by, or None."""
+    match = GENERATED_BY.search(svg)
+    return match.group(1).decode('utf-8', 'replace') if match else None
+
+
+def renderer_version(engine: str = 'dot', backend: str = 'subprocess') -> str:
+    """Identifies the renderer for cache keys by its Graphviz version; asked once per process and backend."""
+    if (engine, backend) not in _versions:
+        if backend == 'inprocess':
+            # pygraphviz's own version says nothing about the libgraphviz it loaded, so ask the library by rendering
+            # an empty graph; if the SVG doesn't name the version, that render's bytes stand in for it
+            import pygraphviz
+            svg = pygraphviz.AGraph(string='digraph {}').draw(format='svg', prog=engine)
+            version = svg_graphviz_version(svg) or f"unknown ({hashlib.sha256(svg).hexdigest()[:16]})"
+            _versions[engine, backend] = f"{engine} - graphviz version {version} (pygraphviz {pygraphviz.__version__})"
+        else:
+            result = subprocess.run([engine, '-V'], capture_output=True)
+            _versions[engine, backend] = (result.stderr or result.stdout).decode('utf-8', 'replace').strip()
+    return _versions[engine, backend]
+
+
+def render_dot(dot_bytes: bytes, fmt: str = 'svg', engine: str = 'dot', backend: str = 'auto') -> bytes:
+    """Lays out DOT held in memory and returns the rendered bytes; raises CalledProcessError on a layout error."""
+    backend = resolve_backend(backend)
+    if backend == 'inprocess':
+        import pygraphviz
+        try:
+            graph = pygraphviz.AGraph(string=dot_bytes.decode('utf-8'))
+            return graph.draw(format=fmt, prog=engine)
+        except Exception as e:  # report layout errors the same way the dot executable does
+            raise subprocess.CalledProcessError(1, ['pygraphviz', engine], stderr=str(e).encode('utf-8')) from e
+    result = subprocess.run([engine, f'-T{fmt}'], input=dot_bytes, capture_output=True, check=True)
+    return result.stdout
+
+
+def render_cached(dot_bytes: bytes, cache=None, fmt: str = 'svg', engine: str = 'dot', backend: str = 'auto') -> bytes:
+    """render_dot behind the RenderCache; identical DOT for the same renderer is only laid out once."""
+    if cache is None:
+        return render_dot(dot_bytes, fmt, engine, backend)
+    from render_cache import warn_unavailable
+    backend = resolve_backend(backend)
+    key = cache.key(dot_bytes, engine, fmt, renderer_version(engine, backend))
+    try:
+        cached = cache.get(key, fmt)
+        if cached:
+            with open(cached, 'rb') as f:
+                return f.read()
+    except OSError as e:  # an unreadable cache is a miss, not a failed render
+        warn_unavailable('Render', e)
+    rendered = render_dot(dot_bytes, fmt, engine, backend)
+    try:
+        cache.put(key, rendered, fmt)
+    except OSError as e:
+        warn_unavailable('Render', e)
+    return rendered
+
+
+def render_job(dot_text: str, svg_file: str, cache_dir: str, renderer: str) -> tuple:
+    """Renders one diagram in a worker process; returns (svg_file, cache_hit, error)."""
+    from render_cache import RenderCache
+    cache = RenderCache(cache_dir) if cache_dir else None
+    try:
+        svg_bytes = render_cached(dot_text.encode('utf-8'), cache, 'svg', 'dot', renderer)
+    except (subprocess.CalledProcessError, OSError) as e:
+        stderr = getattr(e, 'stderr', None)
+        return svg_file, False, stderr.decode('utf-8', 'replace').strip() if stderr else str(e)
+    with open(svg_file, 'wb') as f:
+        f.write(svg_bytes)
+    return svg_file, bool(cache and cache.hits), None
+
+
+def render_pipe(statements, out_file: str, fmt: str = 'svg', engine: str = 'dot', tee=None):
+    """Feeds DOT statements to the engine's stdin as they are emitted and lets it write straight to out_file.
+
+    Nothing is held in memory or written to disk besides the rendered output (and `tee`, a text sink that gets a
+    copy of the DOT when it was asked for). out_file '-' streams to standard output. The destination is only
+    replaced once layout succeeds, so a bad edit never clobbers the last good diagram.
+    Raises CalledProcessError with dot's stderr if layout fails.
+    """
+    import io
+    import os
+    import tempfile
+
+    command = [engine, f'-T{fmt}']
+    if out_file == '-':
+        sys.stdout.flush()
+        destination, tmp_path = sys.stdout.buffer, None
+    else:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(out_file)), suffix=f'.{fmt}.tmp')
+        destination = os.fdopen(fd, 'wb')
+
+    # stderr goes to a temp file rather than a pipe, so a chatty dot can't deadlock against our writes to stdin
+    process = None
+    try:
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=destination, stderr=stderr)
+            stdin = io.TextIOWrapper(process.stdin, encoding='utf-8')
+            try:
+                for statement in statements:
+                    stdin.write(statement)
+                    if tee is not None:
+                        tee.write(statement)
+                stdin.close()
+            except BrokenPipeError:  # dot gave up early; its exit status and stderr say why
+                pass
+            returncode = process.wait()
+            if returncode:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(returncode, command, stderr=stderr.read())
+    except BaseException:
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+        if tmp_path:
+            destination.close()
+            os.remove(tmp_path)
+        raise
+    if tmp_path:
+        destination.close()
+        os.replace(tmp_path, out_file)
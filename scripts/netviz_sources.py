@@ -0,0 +1,165 @@
+#reads topologies straight from Excel workbooks (one sheet per building) instead of hand-exported CSVs
+#
+#python3 scripts/netviz_v5.py campus.xlsx -s
+#python3 scripts/netviz_v5.py campus.xlsx -s --sheets merged
+#use the first command for a diagram per sheet, written to campus_sheets/ with the sheets read, emitted and
+#rendered in parallel, and the second for one diagram of the whole workbook; needs openpyxl
+#(`pip install openpyxl`), which opens the workbook read-only so rows stream out of it one at a time
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import netviz_v5
+from netviz_profile import NULL_PROFILER
+from topo_model import TopologyGraph
+
+# One diagram per sheet, or every sheet's rows in one diagram
+SHEET_MODES = ['each', 'merged']
+
+
+def open_workbook(path: str):
+    """Opens path read-only with openpyxl; raises ImportError naming the package when it isn't installed."""
+    try:
+        import openpyxl
+    except ImportError as e:
+        raise ImportError("Reading .xlsx workbooks needs openpyxl: pip install openpyxl") from e
+    return openpyxl.load_workbook(path, read_only=True, data_only=True)
+
+
+def sheet_names(path: str) -> list:
+    workbook = open_workbook(path)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def cell_text(value) -> str:
+    """Returns a cell as the text a CSV export of it would hold; whole-number floats lose their '.0'."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def read_sheet_columns(path: str, sheet: str) -> tuple:
+    """Streams one sheet and returns the raw columns netviz uses, like read_csv_columns: (columns, row_count).
+
+    Only the used columns of each row are kept. Rows without any value are skipped, as read-only sheets
+    often report formatted but empty rows past the end of the data.
+    """
+    workbook = open_workbook(path)
+    try:
+        rows = workbook[sheet].iter_rows(values_only=True)
+        header = [cell_text(value).strip() for value in next(rows, ())]
+        positions = {col: header.index(col) for col in netviz_v5.SANITIZED_COLUMNS if col in header}
+        columns = {col: [] for col in positions}
+        row_count = 0
+        for row in rows:
+            if all(value is None or value == '' for value in row):
+                continue
+            row_count += 1
+            for col, position in positions.items():
+                columns[col].append((cell_text(row[position]) if position < len(row) else '') or 'Unknown')
+    finally:
+        workbook.close()
+    return columns, row_count
+
+
+def read_sheets(path: str, sheets: list = None) -> dict:
+    """Reads the given sheets (default: all of them) in parallel, a process each; returns {sheet: (columns, row_count)}."""
+    sheets = sheet_names(path) if sheets is None else sheets
+    if len(sheets) <= 1:
+        return {sheet: read_sheet_columns(path, sheet) for sheet in sheets}
+    with ProcessPoolExecutor(max_workers=min(len(sheets), os.cpu_count() or 1)) as pool:
+        return dict(zip(sheets, pool.map(read_sheet_columns, [path] * len(sheets), sheets)))
+
+
+def merge_columns(tables: list) -> tuple:
+    """Concatenates (columns, row_count) tables in order; a column missing from one sheet reads as 'Unknown' there."""
+    names = dict.fromkeys(col for columns, _ in tables for col in columns)
+    merged = {col: [] for col in names}
+    for columns, row_count in tables:
+        for col in names:
+            merged[col].extend(columns.get(col) or ['Unknown'] * row_count)
+    return merged, sum(row_count for _, row_count in tables)
+
+
+def read_workbook_graph(path: str, profiler=NULL_PROFILER) -> TopologyGraph:
+    """Loads every sheet of a workbook into one topology graph, as if the sheets were one long CSV."""
+    with profiler.stage('load'):
+        columns, row_count = merge_columns(list(read_sheets(path).values()))
+    profiler.count('rows', row_count)
+    with profiler.stage('sanitize'):
+        columns = {col: netviz_v5.sanitize_column(values) for col, values in columns.items()}
+    with profiler.stage('graph'):
+        return netviz_v5.graph_from_columns(columns, row_count)
+
+
+def sheet_stem(base_filename: str, sheet: str) -> str:
+    return os.path.join(f"{base_filename}_sheets", netviz_v5.sanitize_input(sheet))
+
+
+def sheet_job(path: str, sheet: str, options: dict) -> tuple:
+    """Reads, emits and optionally renders one sheet in a worker process.
+
+    Returns (sheet, outputs, error, cache_hit, colors) and never raises; colors are the sheet's cluster colors,
+    handed back so the color map can be saved once.
+    """
+    from netviz_render import render_job
+    colors = netviz_v5.ClusterColors(options['color_map'])
+    try:
+        columns, row_count = read_sheet_columns(path, sheet)
+        columns = {col: netviz_v5.sanitize_column(values) for col, values in columns.items()}
+        graph = netviz_v5.graph_from_columns(columns, row_count)
+        if not options['keep_duplicates']:
+            graph, _ = netviz_v5.normalize_topology(graph)
+        dot_text = netviz_v5.generate_graphviz_code(graph, options['paper_size'], options['ratio'], options['splines'],
+                                                    options['ranksep'], colors)
+    except Exception as e:
+        return sheet, [], f"{type(e).__name__}: {e}", False, colors.colors
+
+    stem = sheet_stem(options['base_filename'], sheet)
+    outputs = []
+    if options['dot'] or not options['svg']:
+        with open(f"{stem}.dot", "w") as dot_file:
+            dot_file.write(dot_text)
+        outputs.append(f"{stem}.dot")
+    cache_hit = False
+    if options['svg']:
+        svg_file, cache_hit, error = render_job(dot_text, f"{stem}.svg", options['cache_dir'], options['renderer'])
+        if error:
+            return sheet, outputs, error, False, colors.colors
+        outputs.append(svg_file)
+    return sheet, outputs, None, cache_hit, colors.colors
+
+
+def run_sheets(args, colors):
+    """Writes a DOT (with -s an SVG) per sheet of args.csv_file, reading, emitting and rendering the sheets in parallel."""
+    base_filename = os.path.splitext(args.csv_file)[0]
+    os.makedirs(f"{base_filename}_sheets", exist_ok=True)
+    cache = netviz_v5.open_render_cache(args) if args.svg else None
+    options = {key: getattr(args, key) for key in ('dot', 'svg', 'renderer', 'color_map', 'keep_duplicates',
+                                                   'paper_size', 'ratio', 'splines', 'ranksep')}
+    options.update(base_filename=base_filename, cache_dir=cache.directory if cache else None)
+
+    sheets = sheet_names(args.csv_file)
+    with ProcessPoolExecutor(max_workers=max(1, min(len(sheets), os.cpu_count() or 1))) as pool:
+        results = list(pool.map(sheet_job, [args.csv_file] * len(sheets), sheets, [options] * len(sheets)))
+
+    failed = 0
+    for sheet, outputs, error, cache_hit, sheet_colors in results:
+        for seed, color in sheet_colors.items():
+            if seed not in colors.colors:
+                colors.colors[seed] = color
+                colors.changed = True
+        if error:
+            failed += 1
+            print(f"FAILED {sheet}: {error}")
+        else:
+            print(f"{'CACHED' if cache_hit else 'OK    '} {sheet} -> {', '.join(outputs)}")
+    print(f"##Processed {len(sheets)} sheets: {len(sheets) - failed} ok, {failed} failed")
+    if cache is not None:
+        from render_cache import report
+        report(cache, [(cache_hit, error) for _, _, error, cache_hit, _ in results])
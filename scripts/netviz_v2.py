@@ -2,6 +2,8 @@ import argparse
 from gooey import Gooey, GooeyParser
 import pandas as pd
 import colorsys
+import functools
+import zlib
 import subprocess
 import os
 import shlex
@@ -58,42 +60,50 @@ def generate_zones_from_dataframe(df: pd.DataFrame) -> dict:
         zones.setdefault(row['Location'], {}).setdefault(row['Zone'], []).append(row['Domotz Name'])
     return zones
 
+def index_devices(df: pd.DataFrame) -> dict:
+    """Maps each device name to its first row so node lookups don't rescan the DataFrame."""
+    return df.drop_duplicates(subset='Domotz Name').set_index('Domotz Name').to_dict('index')
+
 def generate_pastel_color(seed: str) -> str:
     """Generates pastel color for visualization."""
-    hue = (hash(seed) % 255) / 255.0
+    hue = (zlib.crc32(seed.encode('utf-8')) % 255) / 255.0
     return "#{:02x}{:02x}{:02x}".format(*[int(c * 255) for c in colorsys.hls_to_rgb(hue, 0.8, 0.7)])
 
 def generate_graphviz_code(df: pd.DataFrame, zones: dict) -> str:
     dot_code = "digraph NetworkDiagram {\n    node [shape=box];\n\n"
+    device_rows = index_devices(df)
     for location, zone_dict in zones.items():
-        location_str = format_identifier(location)
-        dot_code += f'    subgraph cluster_{location_str} {{\n'
+        dot_code += f'    subgraph {format_identifier(f"cluster_{location}")} {{\n'
         dot_code += f'        label = "{format_label(location)}";\n        style = "filled,rounded";\n'
         dot_code += f'        fillcolor = "{generate_pastel_color(location)}";\n'
         for zone, devices in zone_dict.items():
-            zone_str = format_identifier(zone)
-            dot_code += f'        subgraph cluster_{location_str}_{zone_str} {{\n'
+            dot_code += f'        subgraph {format_identifier(f"cluster_{location}_{zone}")} {{\n'
             dot_code += f'            label = "{format_label(zone)}";\n            style = "filled,rounded";\n'
             dot_code += f'            fillcolor = "{generate_pastel_color(location+zone)}";\n'
             for device in devices:
-                device_row = df[df['Domotz Name'] == device].iloc[0]
-                device_str = format_identifier(device)
-                label = f"{format_label(device)}\\n{device_row['Model']}\\n{device_row['MAC']}\\n{device_row['IP Address']}"
-                dot_code += f'            "{device_str}" [label="{label}"];\n'
+                device_row = device_rows[device]
+                label = (f"{format_label(device)}\\n{format_label(device_row['Model'])}\\n{format_label(device_row['MAC'])}"
+                         f"\\n{format_label(device_row['IP Address'])}")
+                dot_code += f'            {format_identifier(device)} [label="{label}"];\n'
             dot_code += '        }\n'
         dot_code += '    }\n\n'
     # Ensure edge definitions use quoted identifiers as well
     return dot_code
 
+# Bound on the memoized identifiers, so a long session doesn't keep every name it has ever seen
+IDENTIFIER_CACHE_SIZE = 1 << 16
+
+@functools.lru_cache(maxsize=IDENTIFIER_CACHE_SIZE)
 def format_identifier(identifier):
     """Enclose the identifier in quotes if it contains special characters or starts with a digit."""
-    if not identifier.isalnum() or identifier[0].isdigit():
-        return f'"{identifier}"'
+    identifier = str(identifier)
+    if not identifier or not (identifier.replace('_', 'a').isalnum() and identifier.isascii()) or identifier[0].isdigit():
+        return f'"{format_label(identifier)}"'
     return identifier
 
 def format_label(label):
-    """Prepare label for DOT by enclosing in quotes and escaping internal quotes."""
-    return label.replace('"', '\\"')
+    """Prepare label for DOT by escaping backslashes and internal quotes."""
+    return str(label).replace('\\', '\\\\').replace('"', '\\"')
 
 
 
@@ -2,6 +2,7 @@ import argparse
 from gooey import Gooey, GooeyParser
 import pandas as pd
 import colorsys
+import zlib
 import subprocess
 import os
 import shlex
@@ -45,9 +46,13 @@ def generate_zones_from_dataframe(df: pd.DataFrame) -> dict:
         zones.setdefault(row['Location'], {}).setdefault(row['Zone'], []).append(row['Domotz Name'])
     return zones
 
+def index_devices(df: pd.DataFrame) -> dict:
+    """Maps each device name to its first row so node lookups don't rescan the DataFrame."""
+    return df.drop_duplicates(subset='Domotz Name').set_index('Domotz Name').to_dict('index')
+
 def generate_pastel_color(seed: str) -> str:
     """Generates pastel color for visualization."""
-    hue = (hash(seed) % 255) / 255.0
+    hue = (zlib.crc32(seed.encode('utf-8')) % 255) / 255.0
     return "#{:02x}{:02x}{:02x}".format(*[int(c * 255) for c in colorsys.hls_to_rgb(hue, 0.8, 0.7)])
 
 
@@ -64,6 +69,7 @@ def generate_graphviz_code(df: pd.DataFrame, zones: dict) -> str:
         compound=true;
         // rankdir=LR; // Uncomment to layout the graph left-to-right
     """
+    device_rows = index_devices(df)
     for location, zone_dict in zones.items():
         location_id = sanitize_input(location)
         dot_code += f'    subgraph "cluster_{location_id}" {{\n'
@@ -75,7 +81,7 @@ def generate_graphviz_code(df: pd.DataFrame, zones: dict) -> str:
             dot_code += f'            label="{zone}";\n            style="filled,rounded";\n'
             dot_code += f'            fillcolor="{generate_pastel_color(location + zone)}";\n'
             for device in devices:
-                device_row = df[df['Domotz Name'] == device].iloc[0]
+                device_row = device_rows[device]
                 label = (f"{device}\\n{device_row['Model']}\\nMAC: {device_row['MAC']}\\n"
                          f"IP: {device_row['IP Address']}")
                 dot_code += f'            "{sanitize_input(device)}" [label="{label}"];\n'
@@ -1,70 +1,426 @@
 import argparse
-from gooey import Gooey, GooeyParser
-import pandas as pd
 import colorsys
-import subprocess
+import contextlib
+import csv
+import functools
 import os
-import shlex
+import re
+import sys
+import zlib
 
+from netviz_profile import NULL_PROFILER, Profiler
+from topo_model import TopologyGraph
+
+# pandas is imported lazily by read_csv_data and subprocess by generate_svg, so headless
+# runs on small CSVs never pay for either; "pd.DataFrame" annotations are left as strings
+
+# Gooey (and wxPython) are imported by run_gui only when the GUI is asked for
+GUI_OPTIONS = {
+    'optional_cols': 2,
+    'program_name': "Network Diagram Generator",
+    'program_description': "Generate network diagrams from CSV data.",
+    'default_size': (610, 610),
+}
+
+# Replacements applied to inputs for Graphviz, in order
+SANITIZE_REPLACEMENTS = {
+    '"': "'",  # Replace double quotes with single quotes
+    ':': '-',  # Replace colons with dashes
+    ',': '',   # Remove commas
+    '\n': ' ', # Replace newlines with spaces
+    ' ': '_',  # Replace spaces with underscores for cluster names
+    '/': '_',  # Replace forward slashes with underscores
+    '\\': '_', # Replace backslashes with underscores
+    '{': '',   # Remove curly braces
+    '}': '',
+    '[': '',   # Remove square brackets
+    ']': '',
+    '|': '_',  # Replace pipe characters with underscores
+    '<': '_',  # Replace less than with underscore
+    '>': '_',  # Replace greater than with underscore
+}
+
+def _compose_replacements(char: str) -> str:
+    for old, new in SANITIZE_REPLACEMENTS.items():
+        char = char.replace(old, new)
+    return char
+
+# Every replacement is single-character, so the ordered chain collapses into one translation table
+SANITIZE_TABLE = str.maketrans({old: _compose_replacements(old) for old in SANITIZE_REPLACEMENTS})
+
+# The same table over UTF-8 bytes; every character involved is ASCII, so multi-byte sequences pass through untouched
+SANITIZE_BYTES_TABLE = bytes.maketrans(
+    ''.join(old for old in SANITIZE_REPLACEMENTS if _compose_replacements(old)).encode(),
+    ''.join(_compose_replacements(old) for old in SANITIZE_REPLACEMENTS if _compose_replacements(old)).encode())
+SANITIZE_BYTES_DELETE = ''.join(old for old in SANITIZE_REPLACEMENTS if not _compose_replacements(old)).encode()
+
+# Columns that end up in DOT identifiers or labels; the rest are loaded as-is
+SANITIZED_COLUMNS = ['Domotz Name', 'Location', 'Zone', 'Model', 'MAC', 'IP Address', 'Uplink', 'Source Port', 'Destination Port']
+
+# Inputs up to this size are loaded with the stdlib csv module, larger ones with pandas
+FAST_LOADER_MAX_BYTES = 5 * 1024 * 1024
+
+# Plain CSVs above this size, and every compressed export, are loaded in chunks by the 'auto' loader
+CHUNKED_LOADER_MIN_BYTES = 256 * 1024 * 1024
+
+# Rows parsed at a time by the chunked loader; one chunk's raw strings are all it holds besides the graph
+CHUNK_ROWS = 50_000
+
+# Exports decompressed while they are read; .zst needs zstandard (`pip install zstandard`)
+COMPRESSED_EXTENSIONS = ('.gz', '.zst')
+
+# pandas reads only empty cells as missing, like the csv loader; by default it would also drop 'NA', 'N/A', 'None', ...
+PANDAS_CSV_OPTIONS = {'dtype': str, 'keep_default_na': False, 'na_values': ['']}
+
+# Excel workbooks, read sheet by sheet through netviz_sources (and openpyxl) instead of as CSV
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xlsm')
+
+# Bound on each memoized identifier cache; a site has far fewer distinct names, ports and zones than this
+IDENTIFIER_CACHE_SIZE = 1 << 16
+
+# DOT IDs that may be written without quotes (a name or a numeral), and the keywords that still need them
+DOT_PLAIN_ID = re.compile(r'[A-Za-z_\x80-\U0010ffff][A-Za-z_0-9\x80-\U0010ffff]*|-?(?:\.[0-9]+|[0-9]+(?:\.[0-9]*)?)')
+DOT_KEYWORDS = {'node', 'edge', 'graph', 'digraph', 'subgraph', 'strict'}
+
+@functools.lru_cache(maxsize=IDENTIFIER_CACHE_SIZE)
 def sanitize_input(input_str):
     """Sanitizes inputs for Graphviz by replacing illegal characters, including those problematic in paths and identifiers."""
-    replacements = {
-        '"': "'",  # Replace double quotes with single quotes
-        ':': '-',  # Replace colons with dashes
-        ',': '',   # Remove commas
-        '\n': ' ', # Replace newlines with spaces
-        ' ': '_',  # Replace spaces with underscores for cluster names
-        '/': '_',  # Replace forward slashes with underscores
-        '\\': '_', # Replace backslashes with underscores
-        '{': '',   # Remove curly braces
-        '}': '',
-        '[': '',   # Remove square brackets
-        ']': '',
-        '|': '_',  # Replace pipe characters with underscores
-        '<': '_',  # Replace less than with underscore
-        '>': '_',  # Replace greater than with underscore
-    }
-    for old, new in replacements.items():
-        input_str = input_str.replace(old, new)
-    return input_str
-
-
-
-def read_csv_data(csv_file: str) -> pd.DataFrame:
-    """Loads network data from CSV into DataFrame, including handling of new columns and empty values."""
-    df = pd.read_csv(csv_file)
-    for col in df.columns:
-        df[col] = df[col].fillna('Unknown')  # Replace NaN values with 'Unknown'
-        df[col] = df[col].apply(lambda x: sanitize_input(str(x)))  # Sanitize inputs
+    return input_str.translate(SANITIZE_TABLE)
+
+def escape_dot(value: str) -> str:
+    """Escapes backslashes and double quotes so value can sit inside a double-quoted DOT string."""
+    if '"' in value or '\\' in value:
+        return value.replace('\\', '\\\\').replace('"', '\\"')
+    return value
+
+@functools.lru_cache(maxsize=IDENTIFIER_CACHE_SIZE)
+def quote_id(value: str) -> str:
+    """Returns value as a double-quoted DOT ID; memoized as the same names recur on every row that mentions them."""
+    return f'"{escape_dot(value)}"'
+
+@functools.lru_cache(maxsize=IDENTIFIER_CACHE_SIZE)
+def dot_id(value: str) -> str:
+    """Returns value as a DOT ID, quoted only when it isn't a plain name or numeral (e.g. a port like Port-1)."""
+    if DOT_PLAIN_ID.fullmatch(value) and value.lower() not in DOT_KEYWORDS:
+        return value
+    return quote_id(value)
+
+def sanitize_column(values: list) -> list:
+    """Sanitizes a whole column of strings with a single bytes.translate over the joined column."""
+    sanitized = '\0'.join(values).encode('utf-8').translate(SANITIZE_BYTES_TABLE, SANITIZE_BYTES_DELETE).decode('utf-8').split('\0')
+    if len(sanitized) != len(values):
+        # A value contained the NUL separator itself; fall back to translating cell by cell
+        sanitized = [value.translate(SANITIZE_TABLE) for value in values]
+    return sanitized
+
+def sanitize_dataframe(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Fills empty values and sanitizes the identifier and label columns in one translation pass per column."""
+    df = df.fillna('Unknown')  # Replace NaN values with 'Unknown'
+    for col in SANITIZED_COLUMNS:
+        if col in df.columns:
+            df[col] = sanitize_column(df[col].tolist())
     return df
 
-def generate_zones_from_dataframe(df: pd.DataFrame) -> dict:
-    """Organizes devices by location and zone, considering new columns."""
-    zones = {}
-    for _, row in df.iterrows():
-        zones.setdefault(row['Location'], {}).setdefault(row['Zone'], []).append(row['Domotz Name'])
-    return zones
+def is_compressed(path: str) -> bool:
+    return path.lower().endswith(COMPRESSED_EXTENSIONS)
+
+def input_stem(path: str) -> str:
+    """Returns path without its extension, and without a compression extension before that ('a.csv.gz' -> 'a')."""
+    if is_compressed(path):
+        path = os.path.splitext(path)[0]
+    return os.path.splitext(path)[0]
+
+def open_csv_text(path: str):
+    """Opens a CSV for reading as text, decompressing .gz and .zst exports on the fly."""
+    lower = path.lower()
+    if lower.endswith('.gz'):
+        import gzip
+        return gzip.open(path, 'rt', newline='', encoding='utf-8-sig')
+    if lower.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Reading .zst exports needs zstandard: pip install zstandard") from e
+        import io
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, newline='', encoding='utf-8-sig')
+    return open(path, newline='', encoding='utf-8-sig')
+
+def read_csv_data(csv_file: str, profiler=NULL_PROFILER) -> "pd.DataFrame":
+    """Loads network data from CSV into DataFrame, including handling of new columns and empty values."""
+    import pandas as pd
+    with profiler.stage('load'):
+        if is_compressed(csv_file):
+            with open_csv_text(csv_file) as f:
+                df = pd.read_csv(f, **PANDAS_CSV_OPTIONS)
+        else:
+            df = pd.read_csv(csv_file, **PANDAS_CSV_OPTIONS)
+    profiler.count('rows', len(df))
+    with profiler.stage('sanitize'):
+        return sanitize_dataframe(df)
+
+def graph_from_columns(columns: dict, row_count: int) -> TopologyGraph:
+    """Builds the topology graph from sanitized column lists: a device per row and a link to its uplink.
+
+    Missing columns read as 'Unknown'.
+    """
+    return add_columns(TopologyGraph(), columns, row_count)
+
+def add_columns(graph: TopologyGraph, columns: dict, row_count: int) -> TopologyGraph:
+    """Adds a device and an uplink per row of sanitized column lists to graph, as graph_from_columns does."""
+    if 'Domotz Name' not in columns:
+        raise ValueError("CSV has no 'Domotz Name' column")
+    missing = ['Unknown'] * row_count
+    name, location, zone, model, mac, ip, uplink, source_port, destination_port = (
+        columns.get(col, missing) for col in SANITIZED_COLUMNS)
+    add_device, add_edge = graph.add_device, graph.add_edge
+    for row in zip(name, location, zone, model, mac, ip):
+        add_device(row[0], location=row[1], zone=row[2], model=row[3], mac=row[4], ip=row[5])
+    for row in zip(name, uplink, source_port, destination_port):
+        add_edge(row[0], row[1], source_port=row[2], target_port=row[3])
+    return graph
+
+def graph_from_dataframe(df: "pd.DataFrame") -> TopologyGraph:
+    """Converts a DataFrame from read_csv_data into the topology graph."""
+    return graph_from_columns({col: df[col].tolist() for col in SANITIZED_COLUMNS if col in df.columns}, len(df))
+
+def read_csv_columns(csv_file: str) -> tuple:
+    """Reads the raw, unsanitized columns netviz uses with the stdlib csv module; returns (columns, row_count)."""
+    with open_csv_text(csv_file) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = [row for row in reader if row]  # pandas skips blank lines too
+    positions = {col: header.index(col) for col in SANITIZED_COLUMNS if col in header}
+    columns = {}
+    for col, position in positions.items():
+        columns[col] = [row[position] if position < len(row) and row[position] else 'Unknown' for row in rows]
+    return columns, len(rows)
+
+def read_csv_graph(csv_file: str, profiler=NULL_PROFILER) -> TopologyGraph:
+    """Loads network data from CSV into the topology graph using only the stdlib csv module."""
+    columns, row_count = read_sanitized_columns(csv_file, 'csv', profiler)
+    with profiler.stage('graph'):
+        return graph_from_columns(columns, row_count)
+
+def read_sanitized_columns(csv_file: str, loader: str, profiler=NULL_PROFILER) -> tuple:
+    """Loads and sanitizes the columns netviz uses with the given loader ('csv' or 'pandas'); returns (columns, row_count)."""
+    if loader == 'pandas':
+        df = read_csv_data(csv_file, profiler)
+        return {col: df[col].tolist() for col in SANITIZED_COLUMNS if col in df.columns}, len(df)
+    with profiler.stage('load'):
+        columns, row_count = read_csv_columns(csv_file)
+    profiler.count('rows', row_count)
+    with profiler.stage('sanitize'):
+        return {col: sanitize_column(values) for col, values in columns.items()}, row_count
+
+def iter_csv_chunks(csv_file: str, chunk_rows: int = CHUNK_ROWS):
+    """Yields (columns, row_count) of raw column lists for every chunk_rows rows, never holding more than one chunk.
+
+    Plain files are memory-mapped, compressed ones decompressed as they stream; empty cells read as 'Unknown'.
+    """
+    import pandas as pd
+    compressed = is_compressed(csv_file)
+    with open_csv_text(csv_file) if compressed else contextlib.nullcontext(csv_file) as source:
+        with pd.read_csv(source, chunksize=chunk_rows, memory_map=not compressed,
+                         **PANDAS_CSV_OPTIONS) as reader:
+            for chunk in reader:
+                chunk = chunk.fillna('Unknown')
+                yield {col: chunk[col].tolist() for col in SANITIZED_COLUMNS if col in chunk.columns}, len(chunk)
+
+def read_chunked_graph(csv_file: str, chunk_rows: int = CHUNK_ROWS, profiler=NULL_PROFILER) -> TopologyGraph:
+    """Loads the topology graph chunk by chunk: each chunk is sanitized and added to the graph before the next is read.
+
+    Peak memory is the interned graph plus one chunk's strings, however large (or compressed) the export.
+    """
+    graph = TopologyGraph()
+    chunks = 0
+    # Parsing, sanitizing and grouping interleave per chunk, so they are timed as one stage
+    with profiler.stage('load+graph'):
+        for columns, row_count in iter_csv_chunks(csv_file, chunk_rows):
+            chunks += 1
+            profiler.count('rows', row_count)
+            add_columns(graph, {col: sanitize_column(values) for col, values in columns.items()}, row_count)
+    profiler.count('chunks', chunks)
+    return graph
+
+def is_workbook(path: str) -> bool:
+    return path.lower().endswith(WORKBOOK_EXTENSIONS)
+
+def open_table_cache(directory: str = None):
+    """Returns a TableCache whose entries are tied to the current sanitizer, so changing it invalidates them."""
+    from table_cache import TableCache, DEFAULT_CACHE_DIR
+    salt = repr((SANITIZE_REPLACEMENTS, SANITIZED_COLUMNS))
+    return TableCache(directory or DEFAULT_CACHE_DIR, salt)
+
+def pick_loader(csv_file: str) -> str:
+    """The 'auto' loader: stdlib csv for small files, pandas for large ones, chunks for huge or compressed ones."""
+    size = os.path.getsize(csv_file)
+    if is_compressed(csv_file) or size > CHUNKED_LOADER_MIN_BYTES:
+        return 'chunked'
+    return 'csv' if size <= FAST_LOADER_MAX_BYTES else 'pandas'
+
+def load_topology(csv_file: str, loader: str = 'auto', profiler=NULL_PROFILER, table_cache=None,
+                  chunk_rows: int = CHUNK_ROWS, status=None) -> TopologyGraph:
+    """Loads the topology graph, choosing the stdlib loader for small inputs unless a loader is forced.
+
+    A workbook is loaded with all of its sheets merged into one graph. With a table_cache, sanitized columns
+    stored by an earlier run on the same content are reused and the CSV isn't parsed at all. The chunked
+    loader never holds the whole table, so it bypasses the table cache. A cache that can't be read or written
+    counts as a miss, with a warning on status (stderr by default).
+    """
+    if is_workbook(csv_file):
+        from netviz_sources import read_workbook_graph
+        return read_workbook_graph(csv_file, profiler)
+    if loader == 'auto':
+        loader = pick_loader(csv_file)
+    if loader == 'chunked':
+        return read_chunked_graph(csv_file, chunk_rows, profiler)
+    table = None
+    if table_cache is not None:
+        from render_cache import warn_unavailable
+        with profiler.stage('cache'):
+            try:
+                table = table_cache.get(csv_file)
+            except OSError as e:
+                warn_unavailable('Table', e, status)
+                table_cache.misses += 1
+                table_cache = None
+    if table is None:
+        table = read_sanitized_columns(csv_file, loader, profiler)
+        if table_cache is not None:
+            with profiler.stage('cache'):
+                try:
+                    table_cache.put(csv_file, *table)
+                except OSError as e:
+                    warn_unavailable('Table', e, status)
+    else:
+        profiler.count('rows', table[1])
+    with profiler.stage('graph'):
+        return graph_from_columns(*table)
+
+def known_port(port: str) -> str:
+    return port if port != 'Unknown' else ""
+
+def port_label(source_port: str, target_port: str) -> str:
+    """Returns the 'X to Y' label of one link, or '' unless both of its ports are known."""
+    source_port, target_port = known_port(source_port), known_port(target_port)
+    return f"{source_port} to {target_port}" if source_port and target_port else ""
+
+def merge_parallel_links(graph: TopologyGraph, edge_ids: list) -> dict:
+    """Returns the attributes of one edge standing in for several links between the same two devices.
+
+    An end keeps its port only when every link uses it; the label lists each distinct link's ports, one per line.
+    """
+    attrs = {}
+    for field in ('source_port', 'target_port'):
+        ports = {graph.edge_attr(edge_id, field) for edge_id in edge_ids}
+        attrs[field] = ports.pop() if len(ports) == 1 else 'Unknown'
+    labels = (graph.edge_attr(edge_id, 'label') or port_label(graph.edge_attr(edge_id, 'source_port'),
+                                                              graph.edge_attr(edge_id, 'target_port'))
+              for edge_id in edge_ids)
+    attrs['label'] = '\n'.join(dict.fromkeys(label for label in labels if label))
+    return attrs
+
+def normalize_topology(graph: TopologyGraph) -> tuple:
+    """Merges repeated device rows into one node and parallel links into one edge; returns (graph, collapsed).
+
+    A device listed on several rows (one per uplink) is placed in the cluster of its first row, and links between
+    the same source and target are combined by merge_parallel_links. collapsed counts the rows and links dropped.
+    """
+    strings = graph.pool.strings
+    normalized = TopologyGraph(graph.node_fields, graph.cluster_fields, graph.edge_fields)
+    placed = bytearray(graph.node_count)
+    for row, node_id in enumerate(graph.rows):
+        if not placed[node_id]:
+            placed[node_id] = 1
+            attrs = {field: graph.attr(node_id, field) for field in graph.node_fields}
+            attrs.update((field, strings[values[row]]) for field, values in graph.row_clusters.items())
+            normalized.add_device(graph.name(node_id), **attrs)
+
+    links = {}
+    for edge_id, source, target in graph.edges():
+        links.setdefault((source, target), []).append(edge_id)
+    for (source, target), edge_ids in links.items():
+        if len(edge_ids) == 1:
+            attrs = {field: graph.edge_attr(edge_ids[0], field) for field in graph.edge_fields}
+        else:
+            attrs = merge_parallel_links(graph, edge_ids)
+        normalized.add_edge(graph.name(source), graph.name(target), **attrs)
+    for node_id, groups in graph.port_groups.items():
+        normalized.port_groups[normalized.node(graph.name(node_id))] = groups
+
+    collapsed = {'device_rows': len(graph.rows) - len(normalized.rows),
+                 'parallel_links': graph.edge_count - normalized.edge_count}
+    return normalized, collapsed
+
+def load_normalized_topology(csv_file: str, loader: str = 'auto', keep_duplicates: bool = False,
+                             profiler=NULL_PROFILER, table_cache=None, chunk_rows: int = CHUNK_ROWS, status=None) -> tuple:
+    """Loads the topology graph and, unless keep_duplicates, normalizes it; returns (graph, collapsed counts)."""
+    graph = load_topology(csv_file, loader, profiler, table_cache, chunk_rows, status)
+    if keep_duplicates:
+        return graph, {'device_rows': 0, 'parallel_links': 0}
+    with profiler.stage('normalize'):
+        return normalize_topology(graph)
+
+def generate_zones_from_dataframe(df: "pd.DataFrame") -> dict:
+    """Organizes device names by location and zone, considering new columns."""
+    graph = graph_from_dataframe(df)
+    return {location: {zone: [graph.name(node_id) for node_id in node_ids] for zone, node_ids in zone_dict.items()}
+            for location, zone_dict in graph.clusters().items()}
+
+# One pastel per hue step, computed once; a seed's color is a lookup by its stable hash
+PASTEL_PALETTE = tuple("#{:02x}{:02x}{:02x}".format(*[int(c * 255) for c in colorsys.hls_to_rgb(step / 255.0, 0.8, 0.7)])
+                       for step in range(255))
 
 def generate_pastel_color(seed: str) -> str:
-    """Generates pastel color for visualization."""
-    hue = (hash(seed) % 255) / 255.0
-    return "#{:02x}{:02x}{:02x}".format(*[int(c * 255) for c in colorsys.hls_to_rgb(hue, 0.8, 0.7)])
-
-def generate_graphviz_code(df: pd.DataFrame, zones: dict, paper_size: str, ratio: str, splines: str, ranksep: str) -> str:
-    """Generates Graphviz DOT code with selected paper size, ratio, spline options, and rank separation."""
-    paper_sizes = {
-        '11x17': '11,17',
-        'ARCH A': '9,12',
-        'ARCH B': '12,18',
-        'ARCH C': '18,24',
-        'ARCH D': '24,36',
-        'ARCH E1': '30,42',
-        'ARCH E': '36,48'
-    }
-    size_attr = paper_sizes.get(paper_size, '24,36')  # Default to ARCH D if not found
-
-    # Start the DOT code for the graph with selected graph attributes
-    dot_code = f"""
+    """Generates pastel color for visualization; CRC-32 instead of hash() so the same seed gets the same color on every run."""
+    return PASTEL_PALETTE[zlib.crc32(seed.encode('utf-8')) % len(PASTEL_PALETTE)]
+
+class ClusterColors:
+    """Memoizes one color per Location/Zone seed, optionally persisted to a per-project JSON color map.
+
+    Colors already in the map are kept even if the palette changes, and can be edited by hand to pin a cluster's color.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.colors = {}
+        self.changed = False
+        if path and os.path.isfile(path):
+            import json
+            with open(path) as f:
+                self.colors = json.load(f)
+
+    def __call__(self, seed: str) -> str:
+        color = self.colors.get(seed)
+        if color is None:
+            color = self.colors[seed] = generate_pastel_color(seed)
+            self.changed = True
+        return color
+
+    def save(self):
+        """Writes the color map back if a new cluster was colored during this run."""
+        if self.path and self.changed:
+            import json
+            with open(self.path, 'w') as f:
+                json.dump(self.colors, f, indent=4, sort_keys=True)
+                f.write('\n')
+            self.changed = False
+
+PAPER_SIZES = {
+    '11x17': '11,17',
+    'ARCH A': '9,12',
+    'ARCH B': '12,18',
+    'ARCH C': '18,24',
+    'ARCH D': '24,36',
+    'ARCH E1': '30,42',
+    'ARCH E': '36,48'
+}
+
+def iter_graph_header(paper_size: str, ratio: str, splines: str, ranksep: str):
+    """Yields the opening of the DOT graph with selected paper size, ratio, spline options, and rank separation."""
+    size_attr = PAPER_SIZES.get(paper_size, '24,36')  # Default to ARCH D if not found
+    yield f"""
     digraph NetworkDiagram {{
         graph [splines={splines}, ratio={ratio}, size="{size_attr}", ranksep={ranksep}];
         node [shape=box, style=filled, fillcolor=lightgrey, fontname=Helvetica];
@@ -72,93 +428,325 @@ def generate_graphviz_code(df: pd.DataFrame, zones: dict, paper_size: str, ratio
         compound=true;
     """
 
-    # Loop through each location, creating subgraphs for better organization and visualization
-    for location, zone_dict in zones.items():
-        location_id = sanitize_input(location)
-        dot_code += f'    subgraph "cluster_{location_id}" {{\n'
-        dot_code += f'        label="{location}";\n        style="filled,rounded";\n'
-        dot_code += f'        fillcolor="{generate_pastel_color(location)}";\n'
-        
-        # Loop through each zone within the location, creating nested subgraphs
-        for zone, devices in zone_dict.items():
-            zone_id = sanitize_input(zone)
-            dot_code += f'        subgraph "cluster_{location_id}_{zone_id}" {{\n'
-            dot_code += f'            label="{zone}";\n            style="filled,rounded";\n'
-            dot_code += f'            fillcolor="{generate_pastel_color(location + zone)}";\n'
-            
-            # Add each device within the zone as a node
-            for device in devices:
-                device_row = df[df['Domotz Name'] == device].iloc[0]
-                label = (f"{device}\\n{device_row['Model']}\\nMAC: {device_row['MAC']}\\n"
-                         f"IP: {device_row['IP Address']}")
-                dot_code += f'            "{sanitize_input(device)}" [label="{label}"];\n'
-            dot_code += '        }\n'
-        dot_code += '    }\n'
-
-    # Loop through the DataFrame rows to create edges between devices with optional port and label information
-    for _, row in df.iterrows():
-        if row['Uplink'] not in ['Internet', 'Unknown'] and pd.notna(row['Uplink']):
-            src_device = sanitize_input(row["Domotz Name"])
-            dst_device = sanitize_input(row["Uplink"])
-            src_port = sanitize_input(row["Source Port"]) if pd.notna(row["Source Port"]) and row["Source Port"] != 'Unknown' else ""
-            dst_port = sanitize_input(row["Destination Port"]) if pd.notna(row["Destination Port"]) and row["Destination Port"] != 'Unknown' else ""
-            label = f"{src_port} to {dst_port}" if src_port and dst_port else ""
-
-            src = f'"{src_device}"' + (f":{src_port}" if src_port else "")
-            dst = f'"{dst_device}"' + (f":{dst_port}" if dst_port else "")
+def iter_location_cluster(location: str, zone_dict: dict, graph: TopologyGraph, colors):
+    """Yields one Location subgraph with its nested Zone subgraphs and device nodes; zone_dict holds node ids.
+
+    The graph's values were sanitized when it was loaded, so they are only quoted and escaped here.
+    """
+    strings, names = graph.pool.strings, graph.node_names
+    models, macs, ips = graph.node_attrs['model'], graph.node_attrs['mac'], graph.node_attrs['ip']
+    yield f'    subgraph {quote_id("cluster_" + location)} {{\n'
+    yield f'        label="{escape_dot(location)}";\n        style="filled,rounded";\n'
+    yield f'        fillcolor="{colors(location)}";\n'
+
+    # Loop through each zone within the location, creating nested subgraphs
+    for zone, zone_devices in zone_dict.items():
+        yield f'        subgraph {quote_id("cluster_" + location + "_" + zone)} {{\n'
+        yield f'            label="{escape_dot(zone)}";\n            style="filled,rounded";\n'
+        yield f'            fillcolor="{colors(location + zone)}";\n'
+
+        # Add each device within the zone as a node
+        for node_id in zone_devices:
+            device = strings[names[node_id]]
+            label = (f"{escape_dot(device)}\\n{escape_dot(strings[models[node_id]])}\\nMAC: {escape_dot(strings[macs[node_id]])}"
+                     f"\\nIP: {escape_dot(strings[ips[node_id]])}")
+            yield f'            {quote_id(device)} [label="{label}"];\n'
+        yield '        }\n'
+    yield '    }\n'
+
+def iter_edges(graph: TopologyGraph):
+    """Yields an edge per uplink, with optional port and label information; endpoints are quoted once per distinct name."""
+    strings, names = graph.pool.strings, graph.node_names
+    for source, target, source_port, target_port, label in zip(graph.edge_sources, graph.edge_targets,
+                                                               graph.edge_attrs['source_port'], graph.edge_attrs['target_port'],
+                                                               graph.edge_attrs['label']):
+        target_name = strings[names[target]]
+        if target_name not in ['Internet', 'Unknown']:
+            src_port, dst_port = known_port(strings[source_port]), known_port(strings[target_port])
+            # Merged parallel links carry their combined label; a single link is labelled by its ports
+            label = strings[label] or port_label(src_port, dst_port)
+            label = escape_dot(label).replace('\n', '\\n')
+
+            src = quote_id(strings[names[source]]) + (f":{dot_id(src_port)}" if src_port else "")
+            dst = quote_id(target_name) + (f":{dot_id(dst_port)}" if dst_port else "")
 
             # Use label for edges; consider using xlabel if external labels are preferred
-            dot_code += f'    {src} -> {dst} [label="{label}"];\n'
-    dot_code += '}\n'
-    return dot_code
+            yield f'    {src} -> {dst} [label="{label}"];\n'
 
+def iter_graphviz_code(graph: TopologyGraph, paper_size: str, ratio: str, splines: str, ranksep: str, colors=None):
+    """Yields Graphviz DOT code statement by statement with selected paper size, ratio, spline options, and rank separation."""
+    yield from iter_graph_header(paper_size, ratio, splines, ranksep)
 
-def generate_svg(dot_file: str):
-    """Generates SVG from DOT using subprocess, ensuring file paths are properly handled."""
-    svg_file = dot_file.replace('.dot', '.svg')
+    colors = colors or ClusterColors()
+
+    # Loop through each location, creating subgraphs for better organization and visualization
+    for location, zone_dict in graph.clusters().items():
+        yield from iter_location_cluster(location, zone_dict, graph, colors)
+
+    yield from iter_edges(graph)
+    yield '}\n'
+
+def write_graphviz_code(sink, graph: TopologyGraph, paper_size: str, ratio: str, splines: str, ranksep: str, colors=None):
+    """Streams Graphviz DOT code to any writable text sink (open file, sys.stdout, a pipe) without building it in memory."""
+    write = sink.write
+    for statement in iter_graphviz_code(graph, paper_size, ratio, splines, ranksep, colors):
+        write(statement)
+
+def generate_graphviz_code(graph: TopologyGraph, paper_size: str, ratio: str, splines: str, ranksep: str, colors=None) -> str:
+    """Generates Graphviz DOT code as a single string; prefer write_graphviz_code for large sites."""
+    return ''.join(iter_graphviz_code(graph, paper_size, ratio, splines, ranksep, colors))
+
+
+def render_svg(dot_file: str, cache=None, backend: str = 'auto', dot_text: str = None, svg_file: str = None) -> str:
+    """Renders DOT to SVG, through the RenderCache if given; raises CalledProcessError if layout fails.
+
+    Pass dot_text to render what was just emitted straight from memory instead of reading dot_file back.
+    svg_file defaults to dot_file with an .svg extension; '-' writes to standard output.
+    """
+    from netviz_render import render_cached
+    svg_file = svg_file or f"{os.path.splitext(dot_file)[0]}.svg"
+    if dot_text is None:
+        with open(dot_file, 'rb') as f:
+            dot_bytes = f.read()
+    else:
+        dot_bytes = dot_text.encode('utf-8')
+    svg_bytes = render_cached(dot_bytes, cache, 'svg', 'dot', backend)
+    if svg_file == '-':
+        sys.stdout.flush()
+        sys.stdout.buffer.write(svg_bytes)
+    else:
+        with open(svg_file, 'wb') as f:
+            f.write(svg_bytes)
+    return svg_file
+
+def open_render_cache(args: argparse.Namespace):
+    """Returns the RenderCache selected on the command line, or None with --no-cache."""
+    if args.no_cache:
+        return None
+    from render_cache import RenderCache, DEFAULT_CACHE_DIR
+    return RenderCache(args.cache_dir or DEFAULT_CACHE_DIR)
+
+def generate_svg(dot_file: str, cache=None, backend: str = 'auto', dot_text: str = None, svg_file: str = None, status=None):
+    """Generates SVG from DOT in-process or through the dot executable, ensuring file paths are properly handled.
+
+    Messages go to status; by default stdout, or stderr when the SVG itself is written to stdout.
+    """
+    import subprocess
+    status = status or (sys.stderr if svg_file == '-' else sys.stdout)
+    try:
+        svg_file = render_svg(dot_file, cache, backend, dot_text, svg_file)
+        print(f"SVG file '{svg_file}' generated.", file=status)
+    except subprocess.CalledProcessError as e:
+        error_message = e.stderr.decode('utf-8') if e.stderr else 'Unknown error'
+        print(f"Error generating SVG: {error_message}", file=status)
+
+def stream_svg(statements, svg_file: str, dot_file: str = None, status=None):
+    """Pipes DOT statements into dot as they are emitted and streams the SVG to svg_file; the DOT is saved only if dot_file is given.
+
+    Messages go to status, chosen as for generate_svg.
+    """
+    import subprocess
+    from netviz_render import render_pipe
+    status = status or (sys.stderr if svg_file == '-' else sys.stdout)
     try:
-        subprocess.run(['dot', '-Tsvg', dot_file, '-o', svg_file], check=True, capture_output=True)
-        print(f"SVG file '{svg_file}' generated.")
+        with (open(dot_file, "w") if dot_file else contextlib.nullcontext()) as tee:
+            render_pipe(statements, svg_file, tee=tee)
+        if dot_file:
+            print(f"DOT file '{dot_file}' saved.", file=status)
+        print(f"SVG file '{svg_file}' generated.", file=status)
     except subprocess.CalledProcessError as e:
         error_message = e.stderr.decode('utf-8') if e.stderr else 'Unknown error'
-        print(f"Error generating SVG: {error_message}")
+        print(f"Error generating SVG: {error_message}", file=status)
 
-@Gooey(optional_cols=2, 
-      program_name="Network Diagram Generator",
-      program_description="Generate network diagrams from CSV data.",
-      default_size=(610, 610))
+def build_parser(parser_class=argparse.ArgumentParser, gui: bool = False) -> argparse.ArgumentParser:
+    """Builds the command line parser; with gui=True the Gooey widget options are passed through as well."""
+    def widget(**gooey_kwargs):
+        return gooey_kwargs if gui else {}
 
-def main():
-    parser = GooeyParser(description="Generate network diagrams from CSV files.")
-    parser.add_argument('csv_file', widget="FileChooser", help="Select a CSV file containing network data.")
+    parser = parser_class(description="Generate network diagrams from CSV files.")
+    parser.add_argument('csv_file', help="Select a CSV file (or .xlsx workbook) containing network data.", **widget(widget="FileChooser"))
     parser.add_argument('-d', '--dot', action='store_true', help="Save the network diagram as a DOT file.")
-    parser.add_argument('-s', '--svg', action='store_true', help="Generate and save the network diagram as an SVG file.")
+    parser.add_argument('-s', '--svg', action='store_true', help="Generate and save the network diagram as an SVG file (add -d to keep the DOT too).")
+    parser.add_argument('--stdout', action='store_true', help="Stream the DOT code to standard output instead of a file.")
     parser.add_argument('-p', '--paper_size', default='ARCH D', choices=['11x17', 'ARCH A', 'ARCH B', 'ARCH C', 'ARCH D', 'ARCH E1', 'ARCH E'],
-                        help="Select the paper size for the diagram", widget='Dropdown')
+                        help="Select the paper size for the diagram", **widget(widget='Dropdown'))
     parser.add_argument('-r', '--ratio', default='auto', choices=['fill', 'auto'],
-                        help="Select the aspect ratio for the diagram", widget='Dropdown')
+                        help="Select the aspect ratio for the diagram", **widget(widget='Dropdown'))
     parser.add_argument('--splines', default='ortho', choices=['ortho', 'curved'],
-                        help="Select whether to use orthogonal splines or not", widget='Dropdown')
-    parser.add_argument('--ranksep', default=1, help="Set the rank separation for the diagram", widget='Slider', gooey_options={'min': 0, 'max': 10})
+                        help="Select whether to use orthogonal splines or not", **widget(widget='Dropdown'))
+    parser.add_argument('--ranksep', default=1, help="Set the rank separation for the diagram",
+                        **widget(widget='Slider', gooey_options={'min': 0, 'max': 10}))
+    parser.add_argument('--loader', default='auto', choices=['auto', 'csv', 'pandas', 'chunked'],
+                        help="CSV loader: 'csv' skips importing pandas, 'auto' picks it for small files and 'chunked' for huge "
+                             "or .gz/.zst ones", **widget(widget='Dropdown'))
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help="Rows the chunked loader parses at a time; bounds its memory use", **widget(widget='IntegerField'))
+    parser.add_argument('--color-map', help="JSON file that keeps each Location/Zone's fill color stable for this project",
+                        **widget(widget='FileSaver'))
+    parser.add_argument('-o', '--output', help="Where to write the SVG (default: next to the CSV; '-' for standard output).",
+                        **widget(widget='FileSaver'))
+    parser.add_argument('--pipe', action='store_true',
+                        help="Stream the DOT straight into dot and the SVG straight to its destination (skips the render cache).")
+    parser.add_argument('--renderer', default='auto', choices=['auto', 'inprocess', 'subprocess'],
+                        help="'inprocess' lays out with libgraphviz via pygraphviz, 'subprocess' runs dot; 'auto' prefers in-process",
+                        **widget(widget='Dropdown'))
+    parser.add_argument('--cache-dir', help="Directory of the SVG render cache (default: ~/.cache/tab2graphviz/render)",
+                        **widget(widget='DirChooser'))
+    parser.add_argument('--no-cache', action='store_true', help="Always re-run dot, even if this exact diagram was rendered before.")
+    parser.add_argument('--table-cache-dir', help="Directory of the parsed-table cache (default: ~/.cache/tab2graphviz/tables)",
+                        **widget(widget='DirChooser'))
+    parser.add_argument('--no-table-cache', action='store_true', help="Always parse the CSV, even if it was loaded before unchanged.")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and regenerate the DOT (and SVG with -s) every time the CSV is saved.")
+    parser.add_argument('--partition-by', choices=['Location', 'Zone'],
+                        help="Write one diagram per Location (or Zone) plus an overview and an index page, rendered in parallel",
+                        **widget(widget='Dropdown'))
+    parser.add_argument('--around', metavar='DEVICE', help="Only draw the devices within --hops links of this device",
+                        **widget(widget='TextField'))
+    parser.add_argument('--hops', type=int, default=1, help="How many links out --around reaches", **widget(widget='IntegerField'))
+    parser.add_argument('--upstream', metavar='DEVICE', help="Only draw this device's chain of uplinks to Internet",
+                        **widget(widget='TextField'))
+    parser.add_argument('--location', help="Only draw the devices in this Location", **widget(widget='TextField'))
+    parser.add_argument('--zone', help="With --location, only draw the devices in this Zone of it", **widget(widget='TextField'))
+    parser.add_argument('--sheets', default='each', choices=['each', 'merged'],
+                        help="For .xlsx workbooks: a diagram per sheet (in <name>_sheets/, built in parallel) or one of all sheets merged.")
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help="Emit every row and link as listed instead of merging repeated devices and parallel links.")
+    parser.add_argument('--profile', action='store_true',
+                        help="Print per-stage wall/CPU times and row, node, edge, cluster and DOT byte counts to stderr.")
+    parser.add_argument('--profile-json', help="Write the same profile as JSON to this file.", **widget(widget='FileSaver'))
+    if not gui:
+        parser.add_argument('--gui', action='store_true', help="Open the graphical interface (requires Gooey).")
+    return parser
 
+def has_query(args: argparse.Namespace) -> bool:
+    """True when any of --around, --upstream, --location or --zone narrows the diagram."""
+    return any(getattr(args, key) is not None for key in ('around', 'upstream', 'location', 'zone'))
 
+def sheet_conflicts(args: argparse.Namespace) -> list:
+    """The options --sheets each can't honor, as each sheet is written to its own file in <name>_sheets/."""
+    flags = {'--around': args.around, '--upstream': args.upstream, '--location': args.location, '--zone': args.zone,
+             '--partition-by': args.partition_by, '--stdout': args.stdout, '-o/--output': args.output,
+             '--pipe': args.pipe, '--profile': args.profile, '--profile-json': args.profile_json}
+    return [flag for flag, value in flags.items() if value]
 
-    args = parser.parse_args()
+def count_graph(profiler, graph: TopologyGraph):
+    """Records node, edge and cluster counts; only called when profiling, as it walks the graph again."""
+    zones = graph.clusters()
+    profiler.count('nodes', graph.device_count)
+    profiler.count('edges', sum(1 for _, _, target in graph.edges() if graph.name(target) not in ['Internet', 'Unknown']))
+    profiler.count('clusters', len(zones) + sum(len(zone_dict) for zone_dict in zones.values()))
 
-    if args.csv_file:
-        df = read_csv_data(args.csv_file)
-        zones = generate_zones_from_dataframe(df)
-        base_filename = os.path.splitext(args.csv_file)[0]
+def run(args: argparse.Namespace):
+    """Loads the CSV and writes the requested DOT/SVG outputs."""
+    if args.csv_file and args.watch:
+        from netviz_watch import watch
+        watch(args)
+    elif args.csv_file and is_workbook(args.csv_file) and args.sheets == 'each':
+        from netviz_sources import run_sheets
+        conflicts = sheet_conflicts(args)
+        if conflicts:
+            build_parser().error(f"{', '.join(conflicts)} can't be used with a diagram per sheet; add --sheets merged")
+        colors = ClusterColors(args.color_map)
+        run_sheets(args, colors)
+        colors.save()
+    elif args.csv_file:
+        profiler = Profiler() if args.profile or args.profile_json else NULL_PROFILER
+        base_filename = input_stem(args.csv_file)
         dot_filename = f"{base_filename}.dot"
-        graphviz_code = generate_graphviz_code(df, zones, args.paper_size, args.ratio, args.splines, args.ranksep)
+        svg_filename = args.output or f"{base_filename}.svg"
+        status = sys.stderr if svg_filename == '-' or args.stdout else sys.stdout
+        table_cache = None if args.no_table_cache else open_table_cache(args.table_cache_dir)
+        graph, collapsed = load_normalized_topology(args.csv_file, args.loader, args.keep_duplicates, profiler, table_cache,
+                                                    args.chunk_rows, status)
+        if table_cache is not None:
+            profiler.count('table_cache_hits', table_cache.hits)
+            try:
+                table_cache.evict()
+            except OSError as e:
+                from render_cache import warn_unavailable
+                warn_unavailable('Table', e, status)
+        if any(collapsed.values()):
+            print(f"##Merged {collapsed['device_rows']} repeated device rows and {collapsed['parallel_links']} parallel links",
+                  file=status)
+        if has_query(args):
+            from netviz_query import query_topology
+            with profiler.stage('query'):
+                try:
+                    selected = query_topology(graph, args)
+                except ValueError as e:
+                    sys.exit(f"Query failed: {e}")
+            print(f"##Query kept {selected.device_count} of {graph.device_count} devices", file=status)
+            graph = selected
+        if profiler.enabled:
+            count_graph(profiler, graph)
+            profiler.count('merged_rows', collapsed['device_rows'])
+            profiler.count('merged_links', collapsed['parallel_links'])
+        colors = ClusterColors(args.color_map)
+        graph_options = (args.paper_size, args.ratio, args.splines, args.ranksep, colors)
+
+        if args.partition_by:
+            from netviz_partition import run_partitioned
+            with profiler.stage('partition'):
+                run_partitioned(args, graph, colors)
+        else:
+            if args.stdout:
+                # Only count the DOT here when it isn't also going to a file, so dot_bytes is one copy's size
+                sink = sys.stdout if args.svg or args.dot else profiler.counting_sink(sys.stdout)
+                with profiler.stage('emit'):
+                    write_graphviz_code(sink, graph, *graph_options)
+
+            if args.svg and args.pipe:
+                # Emission and layout overlap on the pipe, so they are timed as one stage
+                with profiler.stage('emit+render'):
+                    stream_svg(profiler.counting_statements(iter_graphviz_code(graph, *graph_options)),
+                               svg_filename, dot_filename if args.dot else None, status)
+            elif args.svg:
+                # Keep the DOT in memory so the renderer gets it without a round-trip through the file
+                with profiler.stage('emit'):
+                    dot_text = generate_graphviz_code(graph, *graph_options)
+                if profiler.enabled:
+                    profiler.count('dot_bytes', len(dot_text.encode('utf-8')))
+                if args.dot:
+                    with open(dot_filename, "w") as dot_file:
+                        dot_file.write(dot_text)
+                    print(f"DOT file '{dot_filename}' saved.", file=status)
+                cache = open_render_cache(args)
+                with profiler.stage('render'):
+                    generate_svg(dot_filename, cache, args.renderer, dot_text, svg_filename, status)
+                if cache is not None:
+                    from render_cache import report
+                    profiler.count('render_cache_hits', cache.hits)
+                    report(cache, status=status)
+            elif args.dot:
+                with open(dot_filename, "w") as dot_file, profiler.stage('emit'):
+                    write_graphviz_code(profiler.counting_sink(dot_file), graph, *graph_options)
+                print(f"DOT file '{dot_filename}' saved.", file=status)
+
+        colors.save()
+        if args.profile:
+            print(profiler.summary(), file=sys.stderr)
+        if args.profile_json:
+            profiler.write_json(args.profile_json)
+
+def run_gui():
+    """Shows the Gooey form. Gooey re-runs this script with --ignore-gooey, which lands in the headless path."""
+    from gooey import Gooey, GooeyParser
+
+    @Gooey(**GUI_OPTIONS)
+    def gui_main():
+        run(build_parser(GooeyParser, gui=True).parse_args())
 
-        if args.dot or args.svg:
-            with open(dot_filename, "w") as dot_file:
-                dot_file.write(graphviz_code)
-            print(f"DOT file '{dot_filename}' saved.")
+    gui_main()
 
-        if args.svg:
-            generate_svg(dot_filename)
+def main(argv=None):
+    """Runs headless when given arguments; opens the GUI with --gui or when started without any."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or '--gui' in argv:
+        sys.argv = [sys.argv[0]] + [arg for arg in argv if arg != '--gui']
+        run_gui()
+        return
+    run(build_parser().parse_args([arg for arg in argv if arg != '--ignore-gooey']))
 
 if __name__ == "__main__":
     main()
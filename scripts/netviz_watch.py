@@ -0,0 +1,124 @@
+#watches a topology CSV and regenerates its diagram whenever it is saved
+#
+#python3 scripts/netviz_v5.py AHT-Topo.CSV --watch -s
+#use the above command while editing the CSV in Excel; only Location clusters whose rows changed are
+#re-emitted, and dot only runs when the resulting DOT is actually different
+
+import hashlib
+import os
+import time
+
+import netviz_v5
+
+
+class IncrementalEmitter:
+    """Caches each Location cluster's DOT fragment and re-emits only clusters whose rows changed."""
+
+    def __init__(self, paper_size: str, ratio: str, splines: str, ranksep: str, colors=None):
+        self.header = ''.join(netviz_v5.iter_graph_header(paper_size, ratio, splines, ranksep))
+        self.colors = colors or netviz_v5.ClusterColors()
+        self.fragments = {}  # location -> (fingerprint, DOT fragment)
+        self.edges = (None, '')
+
+    def emit(self, graph) -> tuple:
+        """Returns the full DOT text and the locations whose fragments had to be rebuilt."""
+        fragments = {}
+        changed = []
+        for location, zone_dict in graph.clusters().items():
+            fingerprint = tuple(
+                (zone, graph.name(node_id), graph.attr(node_id, 'model'), graph.attr(node_id, 'mac'), graph.attr(node_id, 'ip'))
+                for zone, node_ids in zone_dict.items() for node_id in node_ids)
+            cached = self.fragments.get(location)
+            if cached and cached[0] == fingerprint:
+                fragments[location] = cached
+            else:
+                fragment = ''.join(netviz_v5.iter_location_cluster(location, zone_dict, graph, self.colors))
+                fragments[location] = (fingerprint, fragment)
+                changed.append(location)
+        removed = [location for location in self.fragments if location not in fragments]
+        self.fragments = fragments
+
+        # Every edge field, including the label a merged parallel link carries in place of its ports
+        edge_fingerprint = tuple((graph.name(source), graph.name(target),
+                                  *(graph.edge_attr(edge_id, field) for field in graph.edge_fields))
+                                 for edge_id, source, target in graph.edges())
+        if edge_fingerprint != self.edges[0]:
+            self.edges = (edge_fingerprint, ''.join(netviz_v5.iter_edges(graph)))
+
+        dot_text = ''.join([self.header] + [fragment for _, fragment in fragments.values()] + [self.edges[1], '}\n'])
+        return dot_text, changed + removed
+
+
+def file_signature(path: str):
+    """Returns (mtime, size) for path, or None while it is missing or locked mid-save."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def wait_until_settled(path: str, debounce: float, interval: float):
+    """Waits until the file has stopped changing for `debounce` seconds; Excel saves in several writes."""
+    signature = file_signature(path)
+    settled_since = time.monotonic()
+    while time.monotonic() - settled_since < debounce:
+        time.sleep(interval)
+        current = file_signature(path)
+        if current != signature:
+            signature, settled_since = current, time.monotonic()
+    return signature
+
+
+def watch(args, interval: float = 0.5, debounce: float = 1.0):
+    """Regenerates args.csv_file's DOT (or SVG with -s, both with -d -s) each time the file settles after a change."""
+    csv_file = args.csv_file
+    dot_filename = f"{netviz_v5.input_stem(csv_file)}.dot"
+    colors = netviz_v5.ClusterColors(args.color_map)
+    emitter = IncrementalEmitter(args.paper_size, args.ratio, args.splines, args.ranksep, colors)
+    cache = netviz_v5.open_render_cache(args) if args.svg else None
+    last_signature = None
+    last_digest = None
+
+    print(f"##Watching '{csv_file}' (Ctrl-C to stop)")
+    try:
+        while True:
+            if file_signature(csv_file) != last_signature:
+                last_signature = wait_until_settled(csv_file, debounce, interval)
+                try:
+                    graph, _ = netviz_v5.load_normalized_topology(csv_file, args.loader, args.keep_duplicates,
+                                                                  chunk_rows=args.chunk_rows)
+                except Exception as e:  # half-written or locked file; try again on the next save
+                    print(f"Could not read '{csv_file}': {e}")
+                    continue
+                if netviz_v5.has_query(args):
+                    from netviz_query import query_topology
+                    try:
+                        graph = query_topology(graph, args)
+                    except ValueError as e:  # the device may be renamed or added by the next save
+                        print(f"Query failed: {e}")
+                        continue
+
+                dot_text, changed = emitter.emit(graph)
+                digest = hashlib.sha256(dot_text.encode('utf-8')).hexdigest()
+                print(f"##Re-emitted {len(changed)} of {len(emitter.fragments)} clusters"
+                      + (f": {', '.join(changed)}" if changed else ""))
+                if digest == last_digest:
+                    print("DOT unchanged; skipping render.")
+                    continue
+                last_digest = digest
+
+                if args.dot or not args.svg:
+                    with open(dot_filename, "w") as dot_file:
+                        dot_file.write(dot_text)
+                    print(f"DOT file '{dot_filename}' saved.")
+                colors.save()
+                if args.svg:
+                    netviz_v5.generate_svg(dot_filename, cache, args.renderer, dot_text, args.output)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        if cache is not None:
+            from render_cache import report
+            report(cache)
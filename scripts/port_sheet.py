@@ -0,0 +1,57 @@
+#splits a tab-delimited port sheet into one section per device while reading it
+#
+#python3 scripts/read_proc.py rack_workbook.txt > rack_workbook.dot
+#rack workbooks export every device into one sheet, one block after another; each block starts with a header
+#row like the sheet's first one (the model or SWITCH in the first column, the same port heading in the third),
+#so the readers get one block at a time and never hold more than a single device's rows (read_nax not even that)
+
+import csv
+import itertools
+import operator
+import os
+import sys
+
+
+def is_blank(row: list) -> bool:
+    return not any(cell.strip() for cell in row)
+
+
+def iter_numbered_rows(fileName: str):
+    """Yields (section number, row) for every row; blank rows between devices are dropped, those inside kept as
+    port positions the readers leave unconnected."""
+    if not os.path.isfile(fileName):
+        print (f"""File "{fileName}" not found. Make sure you entered the correct path and filename.""")
+        sys.exit(1)
+    with open(fileName, 'r') as f:
+        reader = csv.reader(f, delimiter='\t')
+        header = next(reader, None)
+        if header is None:
+            return
+        #a new device starts wherever the first header's port heading comes back with a name in front of it
+        heading = header[2] if len(header) > 2 else None
+        section = 0
+        yield section, header
+        blanks = []
+        for row in reader:
+            if is_blank(row):
+                blanks.append(row)
+                continue
+            if heading is not None and len(row) > 2 and row[2] == heading and row[0].strip():
+                section += 1
+            else:
+                for blank in blanks:
+                    yield section, blank
+            blanks = []
+            yield section, row
+
+
+def iter_section_rows(fileName: str):
+    """Yields an iterator over each device section's rows in turn, for readers that work a row at a time."""
+    for _, rows in itertools.groupby(iter_numbered_rows(fileName), key=operator.itemgetter(0)):
+        yield (row for _, row in rows)
+
+
+def iter_sections(fileName: str):
+    """Yields the rows of each device section in turn as a list."""
+    for rows in iter_section_rows(fileName):
+        yield list(rows)
@@ -2,8 +2,7 @@
 #allow the file path the be entered as a command line argument
 import sys  #for command line arguments
 import argparse #for command line arguments
-import os   #for file path
-import csv  #for reading the file
+from port_sheet import iter_section_rows, is_blank  #splits multi-device sheets into one section per device
 
 #set up the graphviz front matter
 
@@ -14,123 +13,110 @@ digraph structs {
     overlap=false;
     rankdir="LR";
     """
-#def generateGraphvizRow(graphvizInput):
-
-
-def readTAB(fileName):
-    #check if the file exists
-    if os.path.isfile(fileName):
-        #open the file and read it
-        with open(fileName, 'r') as f:
-        #with open('data.txt', 'r') as f:
-            reader = csv.reader(f, delimiter='\t')
-            graphvizInput = []
-            for row in reader:
-   
-                #create an array of arrays
-                graphvizInput.append(row)
-    else:
-        print (f"""File "{fileName}" not found. Make sure you entered the correct path and filename.""")
-        sys.exit(1)
-    #print (graphvizInput)
-    lengthgraphvizInput = len(graphvizInput)
-    print (f"""##Rows Consumed: {lengthgraphvizInput}""")
-    return graphvizInput
-
-def generateGraphviz(fileName, deviceID, deviceModel, devicehwAddress, devicePortCapacity):
-    #call getTAB to get the data
-    graphvizInput = readTAB(fileName)
-    #get the length of the array, later we'll subtract one for the header and this will be the number of ports (we hope)
-    deviceTableLength = len(graphvizInput)
-
-    #print(graphvizInput)
-    devicePortCapacity = int(deviceTableLength - 1)
-    #[2][1] is the model, 3rd row, 2nd column, etc
-    #deviceID = str(graphvizInput[1][0]).strip().replace(" ", "").replace(")", "").replace("(", "")
-    deviceModel = str(graphvizInput[0][0]).strip()
-    deviceLocation = str(graphvizInput[2][1]).strip()
-    deviceSerial = str(graphvizInput[3][1]).strip()
-    deviceIP = str(graphvizInput[4][1]).strip()
-    devicehwAddress = str(graphvizInput[5][1]).strip()
-    print (frontMatter)
-
-    #this only works because we strip returns and newlines later
-    label = f"""
-    "{deviceID}" [label="{deviceModel} | ID: {deviceID} | LOC: {deviceLocation} | 
-    SN: {deviceSerial} | IP: {deviceIP} | HW: {devicehwAddress} |
-    {{ PORTS &#92;n 1-8| {{
-    """
-    
-    #for i in range(1,numPorts+1):
-    #add 1 to the range because the array starts at 0
-    for i in range(1,devicePortCapacity+1):
-        #append an output the label
-        label += f"<{deviceID}o{i}> {i} | |"
-        #append an input the label
-        label += f"<{deviceID}i{i}> {i} "
-
-        #add a pipe if it's not the last port of a section
-        if i % 8 != 0:
-            #add a pipe if it's not the last port of the switch
-            if i != devicePortCapacity:
-                label += " | "
-        
-        #get the port info (type, number, vlan, connected device) assume:
+#route columns by header name, with where they sit when the header doesn't name them
+ROUTE_COLUMNS = (('IN TYPE', 2), ('IN #', 3), ('IN DEVICE', 4), ('OUT TYPE', 5), ('OUT #', 6), ('OUT DEVICE', 7), ('SPEAKERS', 8))
+#rows below the header whose second column holds a device detail, [2][1] is the location, 3rd row, 2nd column, etc
+DETAIL_ROWS = {2: 'location', 3: 'serial', 4: 'ip', 5: 'mac'}
+#ports per record group; 0 starts a new group whenever the port type changes instead
+GROUP_SIZE = 8
+
+
+def readRoutes(rows, details):
+    #yields (port, port type, output device, output label, input device) for each route row as it is read
+    #the header row gives the model and the route columns, the device details are picked up on the way past
+    header = [cell.strip() for cell in next(rows, [])]
+    positions = [header.index(name) if name in header else position for name, position in ROUTE_COLUMNS]
+    details['model'] = header[0] if header else ""
+    for i, row in enumerate(rows, 1):
+        if i in DETAIL_ROWS:
+            details[DETAIL_ROWS[i]] = row[1].strip() if len(row) > 1 else ""
+        #a blank row inside the section is a port with nothing routed through it, so it has no type or devices
+        if is_blank(row):
+            yield (i, None, None, None, None)
+            continue
+
+        #get the port info (type, number, connected device) for the input and the output on this row
         #  user copied the data from the switch in the correct order, and with headers
-        # expect array of arrays 0,1,2,3,4,5, 0-length of array
-        
-        #inputs
-        devicePortType = str(graphvizInput[i][2]).strip()
-        devicePortNum = str(graphvizInput[i][3]).strip()
-        devicePortConnectedDevice = str(graphvizInput[i][4]).strip()
-        graphvizLineLabel = f"""{devicePortType} {devicePortNum}"""
-
-        #outputs
-        devicePortTypeOutput = str(graphvizInput[i][5]).strip()
-        devicePortNumOutput = str(graphvizInput[i][6]).strip()
-        devicePortConnectedDeviceOutput = str(graphvizInput[i][7]).strip()
-        devicePortConnectedDeviceSpeakers = str(graphvizInput[i][8]).strip()
-        graphvizLineLabelOutput = f"""{devicePortTypeOutput} {devicePortNumOutput}"""
-        
-        #print all the ports
-
+        devicePortType, devicePortNum, devicePortConnectedDevice, devicePortTypeOutput, devicePortNumOutput, \
+            devicePortConnectedDeviceOutput, devicePortConnectedDeviceSpeakers = (
+                row[position].strip() if position < len(row) else "" for position in positions)
+
+        yield (i, devicePortTypeOutput or devicePortType,
+               f""" {devicePortConnectedDeviceSpeakers}{devicePortConnectedDeviceOutput} ({devicePortTypeOutput}{devicePortNumOutput})""",
+               f"""{devicePortTypeOutput} {devicePortNumOutput}""",
+               f"""{devicePortConnectedDevice} ({devicePortType}{devicePortNum})""")
+
+def groupPorts(ports, groupSize=GROUP_SIZE):
+    #splits (port, port type) pairs into record groups named by their port range:
+    #every groupSize ports, or with groupSize 0 every run of one port type (named by the type too)
+    groups = []
+    for port, portType in ports:
+        if not groups or (len(groups[-1][2]) == groupSize if groupSize else groups[-1][0] != portType):
+            groups.append((portType, port, []))
+        groups[-1][2].append(str(port))
+    return [(f"""{portType + " " if not groupSize else ""}{first}-{sectionPorts[-1]}""", sectionPorts)
+            for portType, first, sectionPorts in groups] or [("", [])]
+
+def recordLabel(deviceID, details, groups):
+    #the record node: device details, then each port group with an output and an input per port
+    label = [f"""    "{deviceID}" [label="{details.get('model', "")} | ID: {deviceID} | LOC: {details.get('location', "")} |     SN: {details.get('serial', "")} | IP: {details.get('ip', "")} | HW: {details.get('mac', "")} |    """]
+    for section, (portRange, sectionPorts) in enumerate(groups):
+        #need double curly to escape the curly braces in the graphviz label
+        #every section after the first closes the one before it
+        label.append(f"""}}}} |-&#92;n-| {{ PORTS &#92;n {portRange} | {{""" if section else f"""{{ PORTS &#92;n {portRange}| {{    """)
+        #an output and an input for every port, with a pipe between ports of a section
+        label.append(" | ".join(f"<{deviceID}o{port}> {port} | |<{deviceID}i{port}> {port} " for port in sectionPorts))
+    #add closing bracket and trailing end quote
+    label.append("}} | SAM MYERS | AHT GLOBAL WEST\"];")
+    return ''.join(label).replace('\n', '').replace('\r', '')
+
+def iterDeviceCode(rows, deviceID, groupSize=GROUP_SIZE):
+    #yields one NAX's output and input edges as its route rows are read, then its record node and row count
+    #only the port numbers are kept until the end, for the record's groups
+    details = {}
+    ports = []
+    for port, portType, output, outputLabel, input in readRoutes(rows, details):
+        if output is None:
+            #a blank row keeps its place in the record, in the group of the port before it, but has no edges
+            ports.append((port, ports[-1][1] if ports else ""))
+            continue
+        ports.append((port, portType))
         #the extra spaces are to make the graphviz output look nice, there's probably a better way to do this
-        #print(f"""{deviceID}:{deviceID}f{str(i)} -> "{devicePortConnectedDevice} ({devicePortType}{str(devicePortNum)})" [label="              {str(graphvizLineLabel)}              "];""")
-        print(f"""{deviceID}:{deviceID}o{str(i)} -> " {devicePortConnectedDeviceSpeakers}{devicePortConnectedDeviceOutput} ({devicePortTypeOutput}{str(devicePortNumOutput)})" [label="              {str(graphvizLineLabelOutput)}              "];""")
-        #print(f""" "{devicePortConnectedDevice} ({devicePortType}{str(devicePortNum)})" -> {deviceID}:{deviceID}i{str(i)} [label="{str(graphvizLineLabel)}"];""")
-        print(f""" "{devicePortConnectedDevice} ({devicePortType}{str(devicePortNum)})" -> {deviceID}:{deviceID}i{str(i)} ;""")
-
-
-        #put a break every 8 ports
-        if i % 8 == 0 and i != 0:
-            if i != devicePortCapacity:
-                startNextPortSection = i + 1
-                if devicePortCapacity - i > 8:
-                    endNextPortSection = i + 8
-                else:
-                    endNextPortSection = devicePortCapacity
-                label += f"""}}}} |-&#92;n-| {{ PORTS &#92;n {startNextPortSection}-{endNextPortSection} | {{"""
-        print
-        
-    #remove line breaks and add closing bracket
-    #add trailing end quote and escape it with a backslash
-    newLabel = str(label + "}} | SAM MYERS | AHT GLOBAL WEST\"];").replace('\n', '').replace('\r', '')
-    #newLabel = str(label + "}} | SAM\"];")
-    print (newLabel)
+        yield f"""{deviceID}:{deviceID}o{port} -> "{output}" [label="              {outputLabel}              "];\n"""
+        yield f""" "{input}" -> {deviceID}:{deviceID}i{port} ;\n"""
+    yield recordLabel(deviceID, details, groupPorts(ports, groupSize)) + "\n"
+    yield f"""##Rows Consumed: {len(ports) + 1}\n"""
+
+def sectionDeviceID(deviceID, section):
+    #the sheet doesn't name its NAXes, so the second one on is told apart by a number after deviceID
+    return deviceID if not section else f"{deviceID}_{section + 1}"
+
+def generateGraphviz(fileName, deviceID, deviceModel, devicehwAddress, devicePortCapacity, groupSize=GROUP_SIZE):
+    #the model, address and capacity are read from the sheet; the arguments are kept for existing callers
+    #every NAX in the sheet becomes a record node in the one digraph; edges are written as their rows are read
+    print (frontMatter)
+    for section, rows in enumerate(iter_section_rows(fileName)):
+        sys.stdout.writelines(iterDeviceCode(rows, sectionDeviceID(deviceID, section), groupSize))
     print("}")
 
 
 
 def main():
+    #--group-size N puts N ports in each record group (default 8); 0 groups them by port type instead
+    argv = list(sys.argv)
+    groupSize = GROUP_SIZE
+    if '--group-size' in argv:
+        position = argv.index('--group-size')
+        groupSize = int(argv[position + 1])
+        del argv[position:position + 2]
     #check if the user entered a file path
-    if len(sys.argv) > 1:
+    if len(argv) > 1:
         #if the user entered a file path, use it
-        fileName = sys.argv[1]      #get the file path from the command line
+        fileName = argv[1]      #get the file path from the command line
         print (f"""##Input File Name: {fileName}""")
-        generateGraphviz(fileName, "asdf12340000", "PowerWand3000", "DE:AD:FA:CE:69:69", 24)
     else:
         fileName = input("Enter the file name: ")
-        generateGraphviz(fileName, "asdf12340000", "PowerWand3000", "DE:AD:FA:CE:69:69", 24)
+    generateGraphviz(fileName, "asdf12340000", "PowerWand3000", "DE:AD:FA:CE:69:69", 24, groupSize)
     
 if __name__ == "__main__":
     #make a switch with 24 ports if they don't specify a number of ports
@@ -139,9 +125,14 @@ if __name__ == "__main__":
 
 #python3 read_whole_section.py 53673_23_SW03.txt > 53673_23_SW03-viz.dot
 #use the above command to consume a TAB delimited file and generate a dot file
+#python3 read_nax.py nax_matrix.txt --group-size 0 > nax_matrix.dot
+#use the above command to group the NAX's ports by type instead of eight at a time
 
 # dot -Tsvg *.dot > /Users/sm/politis/53673_23_SW03-viz.svg
 # use the above command to convert the dot file to svg
 
 #chaining the commands together and doing a little loop:
-# `for i in *.txt; do python3 read_whole_section.py $i >> $i.dot; dot -Tsvg $i.dot >> $i.svg; done`
\ No newline at end of file
+# `for i in *.txt; do python3 read_whole_section.py $i >> $i.dot; dot -Tsvg $i.dot >> $i.svg; done`
+
+#or let netviz_batch.py run the loop across a process pool and report failures per file:
+# `python3 netviz_batch.py . --sheet-reader nax`
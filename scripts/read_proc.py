@@ -3,9 +3,10 @@
 #allow the file path the be entered as a command line argument
 import sys  #for command line arguments
 import argparse #for command line arguments
-import os   #for file path
-import csv  #for reading the file
-import time
+import itertools    #for walking the sheet column by column
+from netviz_profile import NULL_PROFILER, Profiler  #for --profile timings
+from topo_model import TopologyGraph  #shared graph model the sheet is read into
+from port_sheet import iter_sections  #splits multi-device sheets into one section per device
 
 #set up the graphviz front matter
 
@@ -16,179 +17,147 @@ digraph structs {
     overlap=false;
     rankdir="LR";
     """
-#def generateGraphvizRow(graphvizInput):
-
-
-def readTAB(fileName):
-        #check if the file exists
-    if os.path.isfile(fileName):
-        #open the file and read it
-        with open(fileName, 'r') as f:
-        #with open('data.txt', 'r') as f:
-            reader = csv.reader(f, delimiter='\t')
-            graphvizInput = []
-            for row in reader:
-                #print(row)
-                
-                #create an array of arrays
-                graphvizInput.append(row)
-    else:
-        print (f"""File "{fileName}" not found. Make sure you entered the correct path and filename.""")
-        sys.exit(1)
-
-    #print (graphvizInput)
-    lengthgraphvizInput = len(graphvizInput)
-    print (f"""##Rows Consumed: {lengthgraphvizInput}""")
-    #print the number of columns
+#node fields a processor sheet fills in for its device
+SHEET_FIELDS = ('model', 'location', 'serial', 'ip', 'mac')
+#characters dropped from the device ID and port section types so they can name record ports
+ID_DELETE = str.maketrans('', '', ' ()-#')
+
+
+def countRows(graphvizInput, sink=None):
+    #the row and column counts of one device section, printed ahead of its DOT
+    sink = sys.stdout if sink is None else sink
+    print (f"""##Rows Consumed: {len(graphvizInput)}""", file=sink)
+    print (f"""##Columns Consumed: {len(graphvizInput[0])}""", file=sink)
+
+def readGraphs(fileName, profiler=NULL_PROFILER, sink=None):
+    #yields a graph per device in the sheet; the next section is only read once the previous graph has been used
+    for graphvizInput in iter_sections(fileName):
+        countRows(graphvizInput, sink)
+        profiler.count('devices')
+        yield readGraph(graphvizInput, profiler)
+
+def readGraph(graphvizInput, profiler=NULL_PROFILER):
+    #builds the graph of one device section (the rows from its header down to the next device's header)
+    profiler.count('rows', len(graphvizInput))
+    profiler.count('columns', len(graphvizInput[0]))
+    #get the width of the array, every column after the first two is a port section
     deviceTableWidth = len(graphvizInput[0])
-    print (f"""##Columns Consumed: {deviceTableWidth}""")
-    return graphvizInput
-
-def generateGraphviz(fileName, deviceID, deviceModel, devicehwAddress, devicePortCapacity):
-    #call getTAB to get the data
-    graphvizInput = readTAB(fileName)
-    #get the length of the array, later we'll subtract one for the header and this will be the number of ports (we hope)
-    deviceTableLength = len(graphvizInput)
-    #get the width of the array, later we'll subtract one and this will be the number of ports (we hope)
-    deviceTableWidth = len(graphvizInput[0])
-
 
-    #print(graphvizInput)
-    devicePortCapacity = int(deviceTableLength - 1)
-
-    #last port of first section
-    if devicePortCapacity < 4:
-        deviceLastPortOfFirstSection = devicePortCapacity
-    else:
-        deviceLastPortOfFirstSection = 4
     #[2][1] is the model, 3rd row, 2nd column, etc
+    deviceID = str(graphvizInput[1][0]).strip().translate(ID_DELETE)
 
-    deviceID = str(graphvizInput[1][0]).strip().replace(" ", "").replace(")", "").replace("(", "").replace("-", "").replace("#", "")
-    deviceModel = str(graphvizInput[0][0]).strip()
-    deviceLocation = str(graphvizInput[3][1]).strip()
-    deviceSerial = str(graphvizInput[4][1]).strip()
-    deviceIP = str(graphvizInput[5][1]).strip()
-    devicehwAddress = str(graphvizInput[6][1]).strip()
+    #the device is one record-shaped node; its port sections are port groups and every connected port is an edge
+    graph = TopologyGraph(node_fields=SHEET_FIELDS, cluster_fields=())
+    device = graph.add_device(deviceID,
+                              model=str(graphvizInput[0][0]).strip(),
+                              location=str(graphvizInput[3][1]).strip(),
+                              serial=str(graphvizInput[4][1]).strip(),
+                              ip=str(graphvizInput[5][1]).strip(),
+                              mac=str(graphvizInput[6][1]).strip())
+    addEdge = graph.add_edge
 
-    #print the front matter
-    print (frontMatter)
-
-    #this only works because we strip returns and newlines later
-    label = f"""
-    "{deviceID}" [label="{deviceModel} | ID: {deviceID} | LOC: {deviceLocation} | 
-    SN: {deviceSerial} | IP: {deviceIP} | HW: {devicehwAddress} |
-    """
-
-    #saving: {{ COM &#92;n | {{
+    #transpose the sheet once so every column is walked a single time; short rows read as empty cells
+    columns = list(itertools.zip_longest(*graphvizInput, fillvalue=''))
 
     #repeat this with every column
     for col in range(2,deviceTableWidth):
-        #print (f"""{graphvizInput[0][col]}""")
         #if the column is PORT, then we're in the port section, and we want the next column as the port type
-        if f"""{graphvizInput[0][col]}""" == "PORT":
+        if graphvizInput[0][col] == "PORT":
             #the column to the right (col+1) is the port type, i.e. COM, IR, etc
-            portSectionType = f"""{graphvizInput[0][col+1]}"""
-
-            #strip the returns and newlines
-            portSectionType = portSectionType.replace(" ", "").replace(")", "").replace("(", "").replace("-", "").replace("#", "")
-            
-            #portSectionType label. note opening curly brace (must be escaped with second curly brace)
-            
-            #if this isn't first section, close the previous section and open the next one
-            if col > 2:
-                #need double curly to escape the curly braces in the graphviz label
-                #if this isn't first section, close the previous section
-                label += f"""}}}} | {{"""
-
-                        #if this isn't first section, close the previous section
-            if col == 2:
-                #need double curly to escape the curly brace in the graphviz label
-                #if this is the first section, just open the next section
-                label += f"""{{"""
-
-
-            #open the port section type
-            label += f"""{portSectionType} | {{"""            
-
+            portSectionType = str(graphvizInput[0][col+1]).translate(ID_DELETE)
+            sectionPorts = graph.add_port_group(device, portSectionType)
             continue
-        else:   
 
-            next
-
-        #for i in range(1,numPorts+1):
-        #add 1 to the range because the array starts at 0
-        for i in range(1,devicePortCapacity+1):
-            #if devicePortConnectedDevice is empty, make will be an empty string
-            if len(str(graphvizInput[i][col-1]).strip()) < 1:
+        #the column to the left holds the port numbers, this one the connected devices; skip the header row
+        #  user copied the data from the switch in the correct order, and with headers
+        portRows = itertools.islice(zip(columns[col-1], columns[col]), 1, None)
+        for i, (devicePortNum, devicePortConnectedDevice) in enumerate(portRows, 1):
+            #rows without a port number in this section have no port
+            devicePortNum = devicePortNum.strip()
+            if not devicePortNum:
                 continue
-            else:
-                #if we're at the end of the first section, close the label
-                if i > 1:
-                    label += f"""|"""
-               
-                next
-                
-                #append to the label
-                #two curly braces are needed to escape the curly braces in the graphviz label
-                label += f"<{deviceID}{portSectionType}{i}> &#92;n {portSectionType}{i} &#92;n&#92;n"
-
-
-
-            #get the port info (type, number, vlan, connected device) assume:
-            #  user copied the data from the switch in the correct order, and with headers
-            # expect array of arrays 0,1,2,3,4,5, 0-length of array
-            
-            #old way
-            #devicePortType = str(graphvizInput[0][3]).strip()
-
-            #clean this
-            devicePortType = portSectionType.replace(" ", "").replace(")", "").replace("(", "").replace("-", "").replace("#", "")
+            port = str(i)
+            sectionPorts.append(port)
+            addEdge(deviceID, f"""{devicePortConnectedDevice.strip()} ({portSectionType}{port})""",
+                    source_port=portSectionType + port, label=portSectionType + devicePortNum)
+            profiler.count('edges')
+    return graph
+
+def emitDevice(graph, sink=None):
+    #one device's edges and record node are collected first and written to the sink (stdout by default) in one call
+    sink = sys.stdout if sink is None else sink
+    device = graph.rows[0]
+    deviceID = graph.name(device)
+    strings = graph.pool.strings
+    out = []
+
+    #all the ports
+    #the extra spaces are to make the graphviz output look nice, there's probably a better way to do this
+    for source, target, sourcePort, portLabel in zip(graph.edge_sources, graph.edge_targets,
+                                                     graph.edge_attrs['source_port'], graph.edge_attrs['label']):
+        out.append(f"""{deviceID}:{deviceID}{strings[sourcePort]} -> "{graph.name(target)}" [label="         {strings[portLabel]}         "];\n""")
 
-            devicePortNum = str(graphvizInput[i][col-1]).strip()
-            
-            #if devicePortConnectedDevice is empty, make will be an empty string
-            if len(str(graphvizInput[i][col]).strip()) < 1:
-                devicePortConnectedDevice = ""
-            else:
-                devicePortConnectedDevice = str(graphvizInput[i][col]).strip()
-
-            graphvizLineLabel = f"""{devicePortType}{devicePortNum}"""
-            
-            #print all the ports
-
-            #the extra spaces are to make the graphviz output look nice, there's probably a better way to do this
-            print(f"""{deviceID}:{deviceID}{portSectionType}{str(i)} -> "{devicePortConnectedDevice} ({devicePortType}{str(i)})" [label="         {str(graphvizLineLabel)}         "];""")
-            #put a break every 12 ports
-
-
-            
+    #this only works because we strip returns and newlines later
+    label = [f"""
+    "{deviceID}" [label="{graph.attr(device, 'model')} | ID: {deviceID} | LOC: {graph.attr(device, 'location')} | 
+    SN: {graph.attr(device, 'serial')} | IP: {graph.attr(device, 'ip')} | HW: {graph.attr(device, 'mac')} |
+    """]
+
+    for section, (portSectionType, sectionPorts) in enumerate(graph.port_groups.get(device, [])):
+        #need double curly to escape the curly braces in the graphviz label
+        #if this isn't first section, close the previous section and open the next one
+        label.append(f"""}}}} | {{""" if section else f"""{{""")
+
+        #open the port section type
+        label.append(f"""{portSectionType} | {{""")
+        #every port after the first row is separated from the one before
+        label.extend(f"{'|' if int(port) > 1 else ''}<{deviceID}{portSectionType}{port}> &#92;n {portSectionType}{port} &#92;n&#92;n"
+                     for port in sectionPorts)
 
-            print 
     #remove line breaks and add closing bracket
     #add trailing end quote and escape it with a backslash
-    newLabel = str(label + "}} | SAM MYERS| AHT GLOBAL WEST\"];").replace('\n', '').replace('\r', '')
-    #newLabel = str(label + "}} | SAM\"];")
-    print (newLabel)
-    print("}")
+    label.append("}} | SAM MYERS| AHT GLOBAL WEST\"];")
+    out.append(''.join(label).replace('\n', '').replace('\r', ''))
+    out.append("\n")
+    sink.write(''.join(out))
+
+def generateGraphviz(fileName, deviceID, deviceModel, devicehwAddress, devicePortCapacity, profiler=NULL_PROFILER, sink=None):
+    #the ID, model, address and capacity are all read from the sheet; the arguments are kept for existing callers
+    #every device in the sheet becomes a record node in the one digraph, emitted as soon as its section is read
+    sink = sys.stdout if sink is None else sink
+    #reading and emitting are interleaved device by device, so they are timed as one stage
+    with profiler.stage('load+emit'):
+        started = False
+        for graph in readGraphs(fileName, profiler, sink):
+            #the front matter goes out after the first section's counts, as it always has
+            if not started:
+                sink.write(frontMatter + "\n")
+                started = True
+            emitDevice(graph, sink)
+        if not started:
+            sink.write(frontMatter + "\n")
+        sink.write("}\n")
 
 
 #generateGraphviz("asdf12340000", "MX75", "DE:AD:FA:CE:69:69", 24)
 
-#readTab()
 
 
 def main():
-    #started time
-    print (time.time())
+    #--profile prints per-stage timings to stderr so the DOT on stdout stays clean
+    profiler = Profiler() if '--profile' in sys.argv else NULL_PROFILER
+    argv = [arg for arg in sys.argv if arg != '--profile']
     #check if the user entered a file path
-    if len(sys.argv) > 1:
+    if len(argv) > 1:
         #if the user entered a file path, use it
-        fileName = sys.argv[1]      #get the file path from the command line
+        fileName = argv[1]      #get the file path from the command line
         print (f"""##Input File Name: {fileName}""")
-        generateGraphviz(fileName, "asdf12340000", "MX75", "DE:AD:FA:CE:69:69", 24)
     else:
         fileName = input("Enter the file name: ")
-        generateGraphviz(fileName, "asdf12340000", "MX75", "DE:AD:FA:CE:69:69", 24)
+    with profiler.stage('generate'):
+        generateGraphviz(fileName, "asdf12340000", "MX75", "DE:AD:FA:CE:69:69", 24, profiler)
+    if profiler.enabled:
+        print(profiler.summary(), file=sys.stderr)
     
 if __name__ == "__main__":
     #make a switch with 24 ports if they don't specify a number of ports
@@ -202,4 +171,7 @@ if __name__ == "__main__":
 # use the above command to convert the dot file to svg
 
 #chaining the commands together and doing a little loop:
-# `for i in *.txt; do python3 read_whole_section.py $i >> $i.dot; dot -Tsvg $i.dot >> $i.svg; done`
\ No newline at end of file
+# `for i in *.txt; do python3 read_whole_section.py $i >> $i.dot; dot -Tsvg $i.dot >> $i.svg; done`
+
+#or let netviz_batch.py run the loop across a process pool and report failures per file:
+# `python3 netviz_batch.py . --sheet-reader proc`
@@ -3,8 +3,8 @@
 #allow the file path the be entered as a command line argument
 import sys  #for command line arguments
 import argparse #for command line arguments
-import os   #for file path
-import csv  #for reading the file
+from topo_model import TopologyGraph  #shared graph model the sheet is read into
+from port_sheet import iter_sections, is_blank  #splits multi-device sheets into one section per device
 
 #set up the graphviz front matter
 
@@ -15,75 +15,48 @@ digraph structs {
     overlap=false;
     rankdir="LR";
     """
+#node fields a switch sheet fills in for its device
+SHEET_FIELDS = ('model', 'location', 'serial', 'ip', 'mac')
+#characters dropped from the device ID so it can name record ports
+ID_DELETE = str.maketrans('', '', ' ()-#')
+#ports per record section
+PORTS_PER_GROUP = 12
+#columns a switch row is read up to: the details in the second, then type, number, VLAN and connected device
+SHEET_WIDTH = 6
 #def generateGraphvizRow(graphvizInput):
 
 
-def readTAB(fileName):
-        #check if the file exists
-    if os.path.isfile(fileName):
-        #open the file and read it
-        with open(fileName, 'r') as f:
-        #with open('data.txt', 'r') as f:
-            reader = csv.reader(f, delimiter='\t')
-            graphvizInput = []
-            for row in reader:
-                #print(row)
-                
-                #create an array of arrays
-                graphvizInput.append(row)
-    else:
-        print (f"""File "{fileName}" not found. Make sure you entered the correct path and filename.""")
-        sys.exit(1)
-
-    #print (graphvizInput)
-    lengthgraphvizInput = len(graphvizInput)
-    print (f"""##Rows Consumed: {lengthgraphvizInput}""")
-    return graphvizInput
-
-def generateGraphviz(fileName, deviceID, deviceModel, devicehwAddress, devicePortCapacity):
-    #call getTAB to get the data
-    graphvizInput = readTAB(fileName)
+def readGraph(graphvizInput):
+    #builds the graph of one switch section (the rows from its header down to the next switch's header)
     #get the length of the array, later we'll subtract one for the header and this will be the number of ports (we hope)
-    DeviceTableLength = len(graphvizInput)
-
-    #print(graphvizInput)
-    devicePortCapacity = int(DeviceTableLength - 1)
-    #last port of first section
-    if devicePortCapacity < 12:
-        deviceLastPortOfFirstSection = devicePortCapacity
-    else:
-        deviceLastPortOfFirstSection = 12
+    devicePortCapacity = int(len(graphvizInput) - 1)
+    #short rows (and blank ones) read as empty cells, the way read_proc reads them
+    graphvizInput = [row + [''] * (SHEET_WIDTH - len(row)) for row in graphvizInput]
     #[2][1] is the model, 3rd row, 2nd column, etc
-    deviceID = str(graphvizInput[1][0]).strip().replace(" ", "").replace(")", "").replace("(", "").replace("-", "").replace("#", "")
-    deviceModel = str(graphvizInput[2][1]).strip()
-    deviceLocation = str(graphvizInput[3][1]).strip()
-    deviceSerial = str(graphvizInput[4][1]).strip()
-    deviceIP = str(graphvizInput[5][1]).strip()
-    devicehwAddress = str(graphvizInput[6][1]).strip()
-    print (frontMatter)
+    deviceID = str(graphvizInput[1][0]).strip().translate(ID_DELETE)
+
+    #the switch is one record-shaped node; every PORTS_PER_GROUP ports make a port group and every port is an edge
+    graph = TopologyGraph(node_fields=SHEET_FIELDS, cluster_fields=())
+    device = graph.add_device(deviceID,
+                              model=str(graphvizInput[2][1]).strip(),
+                              location=str(graphvizInput[3][1]).strip(),
+                              serial=str(graphvizInput[4][1]).strip(),
+                              ip=str(graphvizInput[5][1]).strip(),
+                              mac=str(graphvizInput[6][1]).strip())
 
-    #this only works because we strip returns and newlines later
-    label = f"""
-    "{deviceID}" [label="{deviceModel} | ID: {deviceID} | LOC: {deviceLocation} | 
-    SN: {deviceSerial} | IP: {deviceIP} | HW: {devicehwAddress} |
-    {{ PORTS &#92;n 1-{deviceLastPortOfFirstSection}| {{
-    """
-    
-    #for i in range(1,numPorts+1):
     #add 1 to the range because the array starts at 0
     for i in range(1,devicePortCapacity+1):
-        #append to the label
-        label += f"<{deviceID}f{i}> &#92;n {i} &#92;n&#92;n"
-        #add a pipe if it's not the last port of a section
-        if i % 12 != 0:
-            #add a pipe if it's not the last port of the switch
-            if i != devicePortCapacity:
-                label += " | "
-        
+        #a new group every PORTS_PER_GROUP ports, named by its port range; the first is there even without ports
+        if i % PORTS_PER_GROUP == 1:
+            sectionPorts = graph.add_port_group(device, f"{i}-{min(i + PORTS_PER_GROUP - 1, devicePortCapacity)}")
+        sectionPorts.append(str(i))
+        #a blank row inside the section keeps its port position, with nothing connected to it
+        if is_blank(graphvizInput[i]):
+            continue
+
         #get the port info (type, number, vlan, connected device) assume:
         #  user copied the data from the switch in the correct order, and with headers
         # expect array of arrays 0,1,2,3,4,5, 0-length of array
-        
         devicePortType = str(graphvizInput[i][2]).strip()
         devicePortNum = str(graphvizInput[i][3]).strip()
         #if devicePortVLAN is empty, make will be an empty string
@@ -92,33 +65,56 @@ def generateGraphviz(fileName, deviceID, deviceModel, devicehwAddress, devicePor
         else:
             devicePortVLAN = "VLAN"+str(graphvizInput[i][4]).strip()
         devicePortConnectedDevice = str(graphvizInput[i][5]).strip()
-        graphvizLineLabel = f"""{devicePortType} {devicePortNum} {devicePortVLAN}"""
-        
-        #print all the ports
-
-        #the extra spaces are to make the graphviz output look nice, there's probably a better way to do this
-        print(f"""{deviceID}:{deviceID}f{str(i)} -> "{devicePortConnectedDevice} ({devicePortType}{str(i)})" [label="         {str(graphvizLineLabel)}         "];""")
-        #put a break every 12 ports
-        if i % 12 == 0 and i != 0:
-            if i != devicePortCapacity:
-                startNextPortSection = i + 1
-                if devicePortCapacity - i > 12:
-                    endNextPortSection = i + 12
-                else:
-                    endNextPortSection = devicePortCapacity
-                label += f"""}}}} |-&#92;n-| {{ PORTS &#92;n {startNextPortSection}-{endNextPortSection} | {{"""
-        print 
+        graph.add_edge(deviceID, f"""{devicePortConnectedDevice} ({devicePortType}{str(i)})""",
+                       source_port=f"f{i}", label=f"""{devicePortType} {devicePortNum} {devicePortVLAN}""")
+    if not devicePortCapacity:
+        graph.add_port_group(device, "1-0")
+    return graph
+
+def emitDevice(graph):
+    #prints the edges and record node of one switch
+    device = graph.rows[0]
+    deviceID = graph.name(device)
+
+    #print all the ports
+    #the extra spaces are to make the graphviz output look nice, there's probably a better way to do this
+    for edge, source, target in graph.edges():
+        print(f"""{deviceID}:{deviceID}{graph.edge_attr(edge, 'source_port')} -> "{graph.name(target)}" [label="         {graph.edge_attr(edge, 'label')}         "];""")
+
+    #this only works because we strip returns and newlines later
+    label = [f"""
+    "{deviceID}" [label="{graph.attr(device, 'model')} | ID: {deviceID} | LOC: {graph.attr(device, 'location')} | 
+    SN: {graph.attr(device, 'serial')} | IP: {graph.attr(device, 'ip')} | HW: {graph.attr(device, 'mac')} |
+    """]
+    for section, (portRange, sectionPorts) in enumerate(graph.port_groups.get(device, [])):
+        #need double curly to escape the curly braces in the graphviz label
+        #every section after the first closes the one before it
+        label.append(f"""}}}} |-&#92;n-| {{ PORTS &#92;n {portRange} | {{""" if section else f"""{{ PORTS &#92;n {portRange}| {{
+    """)
+        #a pipe between the ports of a section
+        label.append(" | ".join(f"<{deviceID}f{port}> &#92;n {port} &#92;n&#92;n" for port in sectionPorts))
     #remove line breaks and add closing bracket
     #add trailing end quote and escape it with a backslash
-    newLabel = str(label + "}} | SAM MYERS| AHT GLOBAL WEST\"];").replace('\n', '').replace('\r', '')
-    #newLabel = str(label + "}} | SAM\"];")
-    print (newLabel)
+    label.append("}} | SAM MYERS| AHT GLOBAL WEST\"];")
+    print (''.join(label).replace('\n', '').replace('\r', ''))
+
+def generateGraphviz(fileName, deviceID, deviceModel, devicehwAddress, devicePortCapacity):
+    #every switch in the sheet becomes a record node in the one digraph, printed as soon as its section is read
+    started = False
+    for graphvizInput in iter_sections(fileName):
+        print (f"""##Rows Consumed: {len(graphvizInput)}""")
+        #the front matter goes out after the first section's row count, as it always has
+        if not started:
+            print (frontMatter)
+            started = True
+        emitDevice(readGraph(graphvizInput))
+    if not started:
+        print (frontMatter)
     print("}")
 
 
 #generateGraphviz("asdf12340000", "MX75", "DE:AD:FA:CE:69:69", 24)
 
-#readTab()
 
 
 def main():
@@ -144,4 +140,7 @@ if __name__ == "__main__":
 # use the above command to convert the dot file to svg
 
 #chaining the commands together and doing a little loop:
-# `for i in *.txt; do python3 read_whole_section.py $i >> $i.dot; dot -Tsvg $i.dot >> $i.svg; done`
\ No newline at end of file
+# `for i in *.txt; do python3 read_whole_section.py $i >> $i.dot; dot -Tsvg $i.dot >> $i.svg; done`
+
+#or let netviz_batch.py run the loop across a process pool and report failures per file:
+# `python3 netviz_batch.py . --sheet-reader section`
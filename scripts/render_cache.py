@@ -0,0 +1,143 @@
+#content-addressed cache of rendered Graphviz output, shared by netviz_v5 and netviz_batch through netviz_render
+#
+#a render is keyed by a hash of the DOT bytes, the layout engine, the output format and the Graphviz
+#version, so regenerating a project folder only pays for layout on diagrams that actually changed. The
+#helpers above RenderCache (cache location, atomic writes, eviction) are shared with table_cache and netviz_remote
+
+import contextlib
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+
+def cache_root(name: str) -> str:
+    """Returns the directory of one of the tool's caches: $XDG_CACHE_HOME/tab2graphviz/<name>, or under ~/.cache."""
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'tab2graphviz', name)
+
+
+DEFAULT_CACHE_DIR = cache_root('render')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def atomic_write(path: str, data):
+    """Writes data to path, creating its directory. data is bytes, or a function that writes a file at the path it's given.
+
+    The file is written next to path and renamed over it, so concurrent runs and interrupted writes never leave
+    half a file behind.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        if callable(data):
+            os.close(fd)
+            data(tmp_path)
+        else:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def evict_files(paths: list, max_bytes: int, max_age_seconds: float) -> list:
+    """Removes the files older than max_age_seconds, then the least recently used until the rest fit in max_bytes.
+
+    Returns the removed paths. Shared by the render and table caches, which both touch an entry on every hit.
+    """
+    entries = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:  # evicted by another run in the meantime
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort()
+    cutoff = time.time() - max_age_seconds
+    total = sum(size for _, size, _ in entries)
+    removed = []
+    for mtime, size, path in entries:
+        if mtime >= cutoff and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed.append(path)
+    return removed
+
+
+def warn_unavailable(name: str, error: OSError, status=None):
+    """Reports a cache that couldn't be read or written; callers carry on as if it had missed."""
+    print(f"##{name} cache unavailable, continuing without it: {error}", file=status or sys.stderr)
+
+
+class RenderCache:
+    """On-disk cache of rendered diagrams with age- and size-based eviction and hit/miss counters."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, dot_bytes: bytes, engine: str, fmt: str, version: str) -> str:
+        """Hashes everything that affects the rendered bytes; version is the renderer's Graphviz version banner."""
+        digest = hashlib.sha256()
+        for part in (version, engine, fmt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(dot_bytes)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.{fmt}")
+
+    def get(self, key: str, fmt: str = 'svg'):
+        """Returns the cached file path for key, or None; hits are touched so eviction is least-recently-used."""
+        path = self._entry_path(key, fmt)
+        if os.path.isfile(path):
+            os.utime(path)
+            self.hits += 1
+            return path
+        self.misses += 1
+        return None
+
+    def put(self, key: str, rendered: bytes, fmt: str = 'svg'):
+        """Stores freshly rendered bytes; safe with several workers rendering the same diagram."""
+        atomic_write(self._entry_path(key, fmt), rendered)
+
+    def evict(self) -> int:
+        """Drops entries older than max_age, then the least recently used until under max_bytes; returns how many."""
+        if not os.path.isdir(self.directory):
+            return 0
+        paths = [os.path.join(root, name) for root, _, names in os.walk(self.directory) for name in names]
+        return len(evict_files(paths, self.max_bytes, self.max_age_seconds))
+
+    def summary(self) -> str:
+        return f"##Render cache: {self.hits} hits, {self.misses} misses ({self.directory})"
+
+
+def report(cache: RenderCache, outcomes=None, status=None):
+    """Evicts old renders and prints the cache's summary to status (stdout by default).
+
+    outcomes are the (cache_hit, error) pairs of a batch whose worker processes counted in RenderCaches of their
+    own; they replace this cache's counters first. A cache that can't be cleaned up only gets a warning.
+    """
+    if outcomes is not None:
+        outcomes = list(outcomes)
+        cache.hits = sum(1 for cache_hit, error in outcomes if cache_hit)
+        cache.misses = sum(1 for cache_hit, error in outcomes if not cache_hit and not error)
+    try:
+        cache.evict()
+    except OSError as e:
+        warn_unavailable('Render', e, status)
+    print(cache.summary(), file=status)
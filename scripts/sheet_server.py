@@ -0,0 +1,82 @@
+#serves a directory of CSVs over HTTP with ETag and Last-Modified, as a local stand-in for Google Sheets exports
+#
+#python3 scripts/sheet_server.py exports/ --port 8765
+#python3 scripts/netviz_remote.py --url-template 'http://127.0.0.1:8765/{sheet_id}.csv' AHT-Topo
+#use the above commands to try netviz_remote's conditional fetching offline; edit a CSV between runs to see it
+#re-fetched, leave it alone to see the 304s in this server's log
+
+import argparse
+import email.utils
+import hashlib
+import os
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SheetHandler(BaseHTTPRequestHandler):
+    """Answers GET /<name> with <directory>/<name>, or 304 when the client's ETag or date is still current."""
+    directory = '.'
+
+    def do_GET(self):
+        name = os.path.basename(urllib.parse.unquote(urllib.parse.urlsplit(self.path).path))
+        path = os.path.join(self.directory, name)
+        if not name or not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        mtime = int(os.path.getmtime(path))
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        last_modified = email.utils.formatdate(mtime, usegmt=True)
+
+        if_none_match = self.headers.get('If-None-Match')
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_none_match is not None:
+            not_modified = if_none_match == etag
+        elif if_modified_since is not None:
+            try:
+                not_modified = mtime <= email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                not_modified = False
+        else:
+            not_modified = False
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header('Content-Type', 'text/csv; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(directory: str, port: int = 0, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Starts serving directory on a background thread and returns the server; port 0 picks a free port."""
+    handler = type('BoundSheetHandler', (SheetHandler,), {'directory': os.path.abspath(directory)})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a directory of CSVs with ETag/Last-Modified for netviz_remote.")
+    parser.add_argument('directory', nargs='?', default='.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = serve(args.directory, args.port, args.host)
+    host, port = server.server_address[:2]
+    print(f"##Serving '{args.directory}' on http://{host}:{port}/ (Ctrl-C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
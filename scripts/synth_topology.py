@@ -0,0 +1,157 @@
+#builds seeded synthetic topology CSVs and tab-delimited port sheets for benchmarking and testing
+#
+#python3 scripts/synth_topology.py csv big.csv --devices 20000 --locations 40 --zones 6 --fan-out 24
+#python3 scripts/synth_topology.py sheet big_proc.txt --kind proc --ports 480
+#python3 scripts/synth_topology.py sheet rack.txt --kind proc --devices 40
+#use the above commands to get inputs shaped like real Domotz exports and port sheets, but as large as you like;
+#the same seed always produces the same file
+
+import argparse
+import csv
+import random
+
+# Header of a Domotz export; older exports put both ports in one Label column, which the early variants read
+TOPOLOGY_COLUMNS = ['Domotz Name', 'Location', 'Zone', 'Model', 'MAC', 'IP Address', 'Uplink',
+                    'Source Port', 'Destination Port', 'Patch Panel', 'Patch Panel Port', 'Label']
+
+SWITCH_MODELS = ['FS-248E-FPOE', 'FS-148F-FPOE', 'CEN-SW-POE-5', 'Fortinet Fortigate 100F']
+ENDPOINT_MODELS = ['TSW-750', 'CEN-RFGW-EX', 'NAX-16ZSA', 'DM-NVX-360', 'UniFi U6-LR']
+
+# Port-sheet layouts, named after the reader that consumes them
+SHEET_KINDS = ['proc', 'nax', 'section']
+PORT_TYPES = ['COM', 'IR', 'RELAY', 'IO', 'LAN']
+
+
+def make_topology_rows(device_count: int, locations: int = 8, zones: int = 4, fan_out: int = 24,
+                       port_density: float = 0.8, seed: int = 0) -> list:
+    """Returns export rows for a tree of devices; each device uplinks to a switch with at most fan_out children.
+
+    Names, locations and models contain the spaces and punctuation real exports have, and port_density is the
+    share of links that carry source and destination ports.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(device_count):
+        is_switch = i == 0 or i <= (device_count - 1) // max(fan_out, 1)
+        parent = (i - 1) // max(fan_out, 1)
+        location = i % locations
+        source_port, target_port = rng.randrange(1, 49), rng.randrange(1, 49)
+        has_ports = i and rng.random() < port_density
+        rows.append({
+            'Domotz Name': f"{'SW' if is_switch else 'DEV'} {i:06d}",
+            'Location': f"Building {location} ({'MDF' if location == 0 else 'IDF'})",
+            'Zone': f"Rack {rng.randrange(zones) + 1}",
+            'Model': rng.choice(SWITCH_MODELS if is_switch else ENDPOINT_MODELS),
+            'MAC': ':'.join(f"{byte:02X}" for byte in rng.getrandbits(48).to_bytes(6, 'big')),
+            'IP Address': f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" if rng.random() < 0.9 else 'IP TBD',
+            'Uplink': 'Internet' if i == 0 else f"SW {parent:06d}",
+            'Source Port': f"Port {source_port}" if has_ports else '',
+            'Destination Port': f"Port {target_port}" if has_ports else '',
+            'Patch Panel': '',
+            'Patch Panel Port': '',
+            'Label': f"Port {source_port} -> Port {target_port}" if has_ports else '',
+        })
+    return rows
+
+
+def write_topology_csv(path: str, rows: list):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=TOPOLOGY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def make_port_sheet(kind: str, ports: int = 48, port_density: float = 0.8, seed: int = 0, device: int = 1) -> list:
+    """Returns the rows of one device's tab-delimited port sheet in the layout read_<kind>.py expects.
+
+    device numbers the device within a multi-device sheet, so that every section gets its own name.
+    """
+    rng = random.Random(seed)
+    suffix = '' if device == 1 else f" {device}"
+    ports = max(ports, 8)  # every layout keeps device details in the first rows
+    details = ['Rack 1', f"SN{rng.getrandbits(32):08X}", f"10.0.{rng.randrange(256)}.{rng.randrange(256)}",
+               ':'.join(f"{byte:02X}" for byte in rng.getrandbits(48).to_bytes(6, 'big'))]
+
+    def connected(label: str) -> str:
+        return label if rng.random() < port_density else ''
+
+    if kind == 'proc':
+        sections = PORT_TYPES[:max(1, min(len(PORT_TYPES), ports // 8))]
+        rows = [['CP4N', ''] + [cell for port_type in sections for cell in ('PORT', port_type)]]
+        per_section = ports // len(sections)
+        for i in range(1, per_section + 1):
+            row = ['', '']
+            for port_type in sections:
+                row += [str(i), connected(f"{port_type} Device {i}")]
+            rows.append(row)
+        rows[1][0] = f"Control Processor{suffix} (Main)"
+        for offset, value in enumerate(details):
+            rows[3 + offset][1] = value
+    elif kind == 'nax':
+        rows = [['NAX-16ZSA', '', 'IN TYPE', 'IN #', 'IN DEVICE', 'OUT TYPE', 'OUT #', 'OUT DEVICE', 'SPEAKERS']]
+        for i in range(1, ports + 1):
+            rows.append(['', '', 'Analog', str(i), connected(f"Source {i}"), 'Zone', str(i),
+                         connected(f"Zone {i}"), connected(f"Speaker Pair {i} ")])
+        rows[1][0] = f"Audio Matrix{suffix}"
+        for offset, value in enumerate(details):
+            rows[2 + offset][1] = value
+    elif kind == 'section':
+        rows = [['SWITCH', '', 'TYPE', 'PORT', 'VLAN', 'DEVICE']]
+        for i in range(1, ports + 1):
+            rows.append(['', '', 'RJ45' if i <= ports - 4 else 'SFP', str(i),
+                         str(rng.choice([1, 10, 20, 50])) if rng.random() < 0.5 else '', connected(f"DEV {i:04d}")])
+        rows[1][0] = f"SW {device:06d} (Core)"
+        rows[2][1] = 'MX75'
+        for offset, value in enumerate(details):
+            rows[3 + offset][1] = value
+    else:
+        raise ValueError(f"Unknown port-sheet kind '{kind}'; expected one of {', '.join(SHEET_KINDS)}")
+    return rows
+
+
+def make_rack_sheet(kind: str, devices: int, ports: int = 48, port_density: float = 0.8, seed: int = 0) -> list:
+    """Returns a rack workbook's sheet: one port sheet per device, one after another with a blank row between."""
+    rows = []
+    for device in range(1, devices + 1):
+        if rows:
+            rows.append([])
+        rows += make_port_sheet(kind, ports, port_density, seed + device - 1, device)
+    return rows
+
+
+def write_port_sheet(path: str, rows: list):
+    with open(path, 'w', newline='') as f:
+        csv.writer(f, delimiter='\t').writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write seeded synthetic topology CSVs and port sheets.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    csv_parser = subparsers.add_parser('csv', help="Write a Domotz-style topology CSV.")
+    csv_parser.add_argument('output')
+    csv_parser.add_argument('--devices', type=int, default=1000)
+    csv_parser.add_argument('--locations', type=int, default=8)
+    csv_parser.add_argument('--zones', type=int, default=4, help="Zones per location.")
+    csv_parser.add_argument('--fan-out', type=int, default=24, help="Most devices one switch uplinks.")
+    csv_parser.add_argument('--port-density', type=float, default=0.8, help="Share of links that list their ports.")
+    csv_parser.add_argument('--seed', type=int, default=0)
+
+    sheet_parser = subparsers.add_parser('sheet', help="Write a tab-delimited port sheet.")
+    sheet_parser.add_argument('output')
+    sheet_parser.add_argument('--kind', default='proc', choices=SHEET_KINDS, help="Layout, named after its reader.")
+    sheet_parser.add_argument('--ports', type=int, default=48)
+    sheet_parser.add_argument('--devices', type=int, default=1, help="Devices in the sheet, one section each.")
+    sheet_parser.add_argument('--port-density', type=float, default=0.8, help="Share of ports with something connected.")
+    sheet_parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == 'csv':
+        write_topology_csv(args.output, make_topology_rows(args.devices, args.locations, args.zones, args.fan_out,
+                                                           args.port_density, args.seed))
+    else:
+        write_port_sheet(args.output, make_rack_sheet(args.kind, args.devices, args.ports, args.port_density, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#persistent cache of loaded and sanitized topology tables, so an unchanged CSV is never parsed twice
+#
+#python3 scripts/netviz_v5.py fleet.csv -s
+#python3 scripts/table_cache.py list
+#python3 scripts/table_cache.py purge
+#the first command parses and sanitizes fleet.csv once and reloads the stored columns on every later run; an entry
+#is found by the source's path and revalidated by its mtime and size, or by a content hash when only the mtime
+#moved (a touch, a checkout). Columns are stored as Arrow/Feather when pyarrow is installed (`pip install pyarrow`)
+#and as NUL-joined UTF-8 columns otherwise; both are read back through a memory map
+
+import argparse
+import contextlib
+import hashlib
+import importlib.util
+import json
+import mmap
+import os
+import shutil
+import time
+
+from render_cache import atomic_write, cache_root, evict_files
+
+DEFAULT_CACHE_DIR = cache_root('tables')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+# Bumped whenever the stored layout changes, so old entries are simply never found again
+FORMAT_VERSION = 1
+# Unreferenced tables younger than this may belong to a run that hasn't written its index yet
+ORPHAN_GRACE_SECONDS = 60
+
+
+def arrow_available() -> bool:
+    """True when pyarrow is installed, so tables are stored as Feather; found without importing it."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_feather(path: str, columns: dict, row_count: int):
+    import pyarrow as pa
+    from pyarrow import feather
+    table = pa.table({col: pa.array(values, type=pa.string()) for col, values in columns.items()})
+    table = table.replace_schema_metadata({'row_count': str(row_count)})
+    feather.write_feather(table, path, compression='uncompressed')
+
+
+def read_feather(path: str) -> tuple:
+    from pyarrow import feather
+    table = feather.read_table(path, memory_map=True)
+    row_count = int((table.schema.metadata or {}).get(b'row_count', table.num_rows))
+    return {col: table.column(col).to_pylist() for col in table.column_names}, row_count
+
+
+def write_columns(path: str, columns: dict, row_count: int):
+    """Writes a JSON header line naming each column and its byte length, then each column's values joined by NULs."""
+    blobs = {col: '\0'.join(values).encode('utf-8') for col, values in columns.items()}
+    header = {'row_count': row_count, 'columns': [[col, len(blob)] for col, blob in blobs.items()]}
+    with open(path, 'wb') as f:
+        f.write(json.dumps(header).encode('utf-8') + b'\n')
+        for blob in blobs.values():
+            f.write(blob)
+
+
+def read_columns(path: str) -> tuple:
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        newline = view.find(b'\n')
+        header = json.loads(view[:newline])
+        row_count = header['row_count']
+        columns = {}
+        offset = newline + 1
+        for col, length in header['columns']:
+            columns[col] = view[offset:offset + length].decode('utf-8').split('\0') if row_count else []
+            offset += length
+    return columns, row_count
+
+
+class TableCache:
+    """On-disk cache of sanitized column tables keyed by source path, with mtime/size/hash revalidation.
+
+    salt identifies the loader and sanitizer that produced a table; entries made with a different salt are never used.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, salt: str = '', max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        self.directory = directory
+        self.salt = salt
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400
+        self.extension = 'feather' if arrow_available() else 'cols'
+        self.hits = 0
+        self.misses = 0
+        self._digests = {}  # realpath -> (size, mtime_ns, sha256), so a miss's hash is reused by put()
+
+    def _index_path(self, source: str) -> str:
+        key = hashlib.sha256(os.path.realpath(source).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, 'index', f"{key}.json")
+
+    def _table_path(self, content_digest: str, variant: str) -> str:
+        key = hashlib.sha256(f"{FORMAT_VERSION}\0{self.salt}\0{variant}\0{content_digest}".encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.{self.extension}")
+
+    def _read_index(self, source: str) -> dict:
+        try:
+            with open(self._index_path(source)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _digest(self, source: str, stat: os.stat_result) -> str:
+        """Hashes source, at most once per content as long as its size and mtime stay put."""
+        key = os.path.realpath(source)
+        size, mtime_ns, digest = self._digests.get(key, (None, None, None))
+        if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            digest = file_digest(source)
+            self._digests[key] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    def get(self, source: str, variant: str = ''):
+        """Returns (columns, row_count) stored for source's current content and variant (e.g. the loader), or None."""
+        index = self._read_index(source)
+        stat = os.stat(source)
+        if not index or index.get('size') != stat.st_size:
+            self.misses += 1
+            return None
+        if index.get('mtime_ns') != stat.st_mtime_ns:
+            # Only the mtime moved; the content decides
+            if self._digest(source, stat) != index.get('sha256'):
+                self.misses += 1
+                return None
+            index['mtime_ns'] = stat.st_mtime_ns
+            atomic_write(self._index_path(source), lambda path: self._dump(path, index))
+        table_path = self._table_path(index['sha256'], variant)
+        try:
+            table = read_feather(table_path) if self.extension == 'feather' else read_columns(table_path)
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        os.utime(table_path)
+        self.hits += 1
+        return table
+
+    def put(self, source: str, columns: dict, row_count: int, variant: str = '') -> bool:
+        """Stores source's sanitized columns; returns False for values the column format can't hold (NULs)."""
+        if self.extension == 'cols' and any('\0' in value for values in columns.values() for value in values):
+            return False
+        stat = os.stat(source)
+        digest = self._digest(source, stat)
+        table_path = self._table_path(digest, variant)
+        # Tables of the source's previous content (or of another salt) are superseded; other variants of it are kept
+        tables = {}
+        for old_variant, old_name in self._read_index(source).get('tables', {}).items():
+            old_path = os.path.join(self.directory, old_name)
+            if old_variant != variant and old_path == self._table_path(digest, old_variant):
+                tables[old_variant] = old_name
+            elif old_path != table_path:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(old_path)
+        tables[variant] = os.path.relpath(table_path, self.directory)
+        index = {'source': os.path.realpath(source), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                 'sha256': digest, 'rows': row_count, 'tables': tables}
+        write = write_feather if self.extension == 'feather' else write_columns
+        atomic_write(table_path, lambda path: write(path, columns, row_count))
+        atomic_write(self._index_path(source), lambda path: self._dump(path, index))
+        return True
+
+    def _dump(self, path: str, index: dict):
+        with open(path, 'w') as f:
+            json.dump(index, f, indent=2)
+
+    def _indexes(self):
+        """Yields (index path, index entry) for every source with a cached table."""
+        index_dir = os.path.join(self.directory, 'index')
+        for name in sorted(os.listdir(index_dir)) if os.path.isdir(index_dir) else []:
+            path = os.path.join(index_dir, name)
+            try:
+                with open(path) as f:
+                    yield path, json.load(f)
+            except (OSError, ValueError):  # a temp file mid-write, or one left by an interrupted run
+                yield path, {}
+
+    def _table_files(self) -> list:
+        return [os.path.join(root, name) for root, _, names in os.walk(self.directory)
+                if os.path.basename(root) != 'index' for name in names]
+
+    def entries(self) -> list:
+        """Returns the index entry of every source with a cached table."""
+        return [index for _, index in self._indexes() if index]
+
+    def evict(self) -> int:
+        """Drops tables older than max_age, then the least recently used until under max_bytes, then any table
+        and index entry left without the other (or whose source is gone); returns how many tables were removed."""
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = len(evict_files(self._table_files(), self.max_bytes, self.max_age_seconds))
+
+        cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        referenced = set()
+        for index_path, index in self._indexes():
+            tables = {os.path.join(self.directory, name) for name in index.get('tables', {}).values()}
+            try:
+                live = index and os.path.isfile(index.get('source', '')) and any(os.path.isfile(path) for path in tables)
+                if live or (not index and os.path.getmtime(index_path) >= cutoff):
+                    referenced |= tables
+                    continue
+                os.remove(index_path)
+            except FileNotFoundError:  # cleaned up by another run in the meantime
+                continue
+        for path in self._table_files():
+            try:
+                if path not in referenced and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def purge(self) -> int:
+        """Removes every cached table and index entry; returns how many tables there were."""
+        if not os.path.isdir(self.directory):
+            return 0
+        count = len(self._table_files())
+        shutil.rmtree(self.directory)
+        return count
+
+    def summary(self) -> str:
+        return f"##Table cache: {self.hits} hits, {self.misses} misses ({self.directory})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or purge the cache of parsed topology tables.")
+    parser.add_argument('command', choices=['list', 'purge'])
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    cache = TableCache(args.cache_dir)
+    if args.command == 'purge':
+        print(f"##Purged {cache.purge()} cached tables from '{args.cache_dir}'")
+    else:
+        for entry in cache.entries():
+            print(f"{entry.get('rows', '?'):>9} rows  {entry.get('source')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#shared in-memory topology graph; the CSV loaders and the port-sheet readers build one, the emitters read it
+#
+#every name and attribute value is interned once into a string pool, nodes are small integer ids, edges are
+#parallel arrays of node ids, and each attribute is an array of pool ids indexed by node or edge id, so
+#indexing, de-duplication and caching can be written once against this instead of once per reader
+
+from array import array
+
+# Device attributes carried by CSV topologies, and the fields their Location/Zone clusters are keyed by
+NODE_FIELDS = ('location', 'zone', 'model', 'mac', 'ip')
+CLUSTER_FIELDS = ('location', 'zone')
+EDGE_FIELDS = ('source_port', 'target_port', 'label')
+
+
+class StringPool:
+    """Interns strings to small integers; id 0 is always the empty string."""
+    __slots__ = ('strings', 'ids')
+
+    def __init__(self):
+        self.strings = ['']
+        self.ids = {'': 0}
+
+    def intern(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.strings[string_id]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class TopologyGraph:
+    """Devices, the clusters their rows place them in, their ports, and the links between them.
+
+    A node exists for every name seen, as a device or only as a link end; only devices carry attributes.
+    When a device appears on several rows the first row's attributes win, but every row keeps its place in
+    the clusters, as the CSV generators have always drawn it.
+    """
+
+    def __init__(self, node_fields: tuple = NODE_FIELDS, cluster_fields: tuple = CLUSTER_FIELDS,
+                 edge_fields: tuple = EDGE_FIELDS):
+        self.pool = StringPool()
+        self.node_fields = node_fields
+        self.cluster_fields = cluster_fields
+        self.edge_fields = edge_fields
+        self.node_ids = {}                # name -> node id
+        self.node_names = array('I')      # node id -> pool id of its name
+        self.described = bytearray()      # node id -> 1 once a device row has set its attributes
+        self.node_attrs = {field: array('I') for field in node_fields}
+        self.rows = array('I')            # device row -> node id
+        self.row_clusters = {field: array('I') for field in cluster_fields}
+        self.edge_sources = array('I')
+        self.edge_targets = array('I')
+        self.edge_attrs = {field: array('I') for field in edge_fields}
+        self.port_groups = {}             # node id -> [[group, [port, ...]], ...] for record-shaped devices
+
+    def node(self, name: str) -> int:
+        """Returns the id for name, creating an undescribed node the first time it is seen."""
+        node_id = self.node_ids.get(name)
+        if node_id is None:
+            node_id = self.node_ids[name] = len(self.node_names)
+            self.node_names.append(self.pool.intern(name))
+            self.described.append(0)
+            for values in self.node_attrs.values():
+                values.append(0)
+        return node_id
+
+    def add_device(self, name: str, **attrs) -> int:
+        """Adds one device row: places the node in its row's clusters and describes it if no row has yet."""
+        node_id = self.node(name)
+        intern = self.pool.intern
+        self.rows.append(node_id)
+        for field, values in self.row_clusters.items():
+            values.append(intern(attrs.get(field, '')))
+        if not self.described[node_id]:
+            self.described[node_id] = 1
+            for field, value in attrs.items():
+                self.node_attrs[field][node_id] = intern(value)
+        return node_id
+
+    def add_edge(self, source: str, target: str, **attrs) -> int:
+        """Adds a link between two names and returns its edge id."""
+        intern = self.pool.intern
+        self.edge_sources.append(self.node(source))
+        self.edge_targets.append(self.node(target))
+        for field, values in self.edge_attrs.items():
+            values.append(intern(attrs.get(field, '')))
+        return len(self.edge_sources) - 1
+
+    def add_port_group(self, node_id: int, group: str) -> list:
+        """Opens a new, initially empty, group of ports on a record-shaped device and returns its port list."""
+        ports = []
+        self.port_groups.setdefault(node_id, []).append([group, ports])
+        return ports
+
+    def name(self, node_id: int) -> str:
+        return self.pool.strings[self.node_names[node_id]]
+
+    def attr(self, node_id: int, field: str) -> str:
+        return self.pool.strings[self.node_attrs[field][node_id]]
+
+    def edge_attr(self, edge_id: int, field: str) -> str:
+        return self.pool.strings[self.edge_attrs[field][edge_id]]
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_names)
+
+    @property
+    def device_count(self) -> int:
+        return self.described.count(1)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_sources)
+
+    def clusters(self) -> dict:
+        """Groups device rows by the cluster fields, e.g. {location: {zone: [node id, ...]}}, in first-seen order."""
+        strings = self.pool.strings
+        outer_field, inner_field = self.cluster_fields
+        clusters = {}
+        for node_id, outer, inner in zip(self.rows, self.row_clusters[outer_field], self.row_clusters[inner_field]):
+            clusters.setdefault(strings[outer], {}).setdefault(strings[inner], []).append(node_id)
+        return clusters
+
+    def edges(self):
+        """Yields (edge id, source node id, target node id) for every link in insertion order."""
+        return zip(range(len(self.edge_sources)), self.edge_sources, self.edge_targets)
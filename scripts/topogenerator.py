@@ -1,6 +1,7 @@
 import argparse
 import pandas as pd
 import colorsys
+import zlib
 
 def generate_graphviz_code_from_csv(csv_file):
     # Read CSV data into a pandas DataFrame
@@ -19,9 +20,12 @@ def generate_graphviz_code_from_csv(csv_file):
             zones[location][zone] = []
         zones[location][zone].append(device)
 
+    # Index each device's first row once so node emission is a lookup, not a scan per device
+    device_rows = df.drop_duplicates(subset='Domotz Name').set_index('Domotz Name').to_dict('index')
+
     # Function to generate pastel colors
     def generate_pastel_color(seed):
-        hue = (hash(seed) % 255) / 255.0
+        hue = (zlib.crc32(seed.encode('utf-8')) % 255) / 255.0
         saturation = 0.7
         lightness = 0.8
         r, g, b = colorsys.hls_to_rgb(hue, lightness, saturation)
@@ -32,8 +36,8 @@ def generate_graphviz_code_from_csv(csv_file):
         devices = zones[location][zone]
         node_statements = ""
         for device in devices:
-            device_row = df.loc[df['Domotz Name'] == device]
-            label = f"{device}\n{device_row['Model'].values[0]}\n{device_row['MAC'].values[0]}\n{device_row['IP Address'].values[0]}"
+            device_row = device_rows[device]
+            label = f"{device}\n{device_row['Model']}\n{device_row['MAC']}\n{device_row['IP Address']}"
             node_statements += f'"{device}" [label="{label}"];\n'
         return node_statements
 
@@ -3,6 +3,7 @@
 import argparse
 import pandas as pd
 import colorsys
+import zlib
 from typing import Dict, List
 
 def read_csv_data(csv_file: str) -> pd.DataFrame:
@@ -40,6 +41,18 @@ def generate_zones_from_dataframe(df: pd.DataFrame) -> Dict[str, Dict[str, List[
         zones.setdefault(location, {}).setdefault(zone, []).append(device)
     return zones
 
+def index_devices(df: pd.DataFrame) -> Dict[str, Dict]:
+    """
+    Maps each device name to its first row so node lookups don't rescan the DataFrame.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing network data.
+
+    Returns:
+        Dict: Device name to a dictionary of that device's column values.
+    """
+    return df.drop_duplicates(subset='Domotz Name').set_index('Domotz Name').to_dict('index')
+
 def generate_pastel_color(seed: str) -> str:
     """
     Generates a pastel color based on a hash of the input seed.
@@ -50,17 +63,17 @@ def generate_pastel_color(seed: str) -> str:
     Returns:
         str: Hexadecimal color code.
     """
-    hue = (hash(seed) % 255) / 255.0
+    hue = (zlib.crc32(seed.encode('utf-8')) % 255) / 255.0
     saturation, lightness = 0.7, 0.8
     r, g, b = colorsys.hls_to_rgb(hue, lightness, saturation)
     return "#{:02x}{:02x}{:02x}".format(int(r * 255), int(g * 255), int(b * 255))
 
-def generate_device_nodes(df: pd.DataFrame, location: str, zone: str, zones: Dict[str, Dict[str, List[str]]]) -> str:
+def generate_device_nodes(device_rows: Dict[str, Dict], location: str, zone: str, zones: Dict[str, Dict[str, List[str]]]) -> str:
     """
     Generates Graphviz nodes for devices in a given location and zone.
 
     Parameters:
-        df (pd.DataFrame): DataFrame containing network data.
+        device_rows (Dict): Device index built by index_devices.
         location (str): Network location.
         zone (str): Network zone.
         zones (Dict): A dictionary organizing devices by location and zone.
@@ -70,8 +83,8 @@ def generate_device_nodes(df: pd.DataFrame, location: str, zone: str, zones: Dic
     """
     node_statements = ""
     for device in zones[location][zone]:
-        device_row = df.loc[df['Domotz Name'] == device]
-        label = f"{device}\\n{device_row['Model'].values[0]}\\n{device_row['MAC'].values[0]}\\n{device_row['IP Address'].values[0]}"
+        device_row = device_rows[device]
+        label = f"{device}\\n{device_row['Model']}\\n{device_row['MAC']}\\n{device_row['IP Address']}"
         node_statements += f'"{device}" [label="{label}"];\n'
     return node_statements
 
@@ -89,6 +102,7 @@ def generate_graphviz_code(df: pd.DataFrame, zones: Dict[str, Dict[str, List[str
     dot_code = "digraph NetworkDiagram {\n"
     dot_code += '    node [shape=box];\n\n'
 
+    device_rows = index_devices(df)
     for location, zone_dict in zones.items():
         location_id = location.replace(" ", "_")
         dot_code += f'    subgraph cluster_{location_id} {{\n'
@@ -101,7 +115,7 @@ def generate_graphviz_code(df: pd.DataFrame, zones: Dict[str, Dict[str, List[str
             dot_code += f'            label = "{zone}";\n'
             dot_code += '            style = "filled,rounded";\n'
             dot_code += f'            fillcolor = "{generate_pastel_color(location+zone)}";\n'
-            dot_code += generate_device_nodes(df, location, zone, zones)
+            dot_code += generate_device_nodes(device_rows, location, zone, zones)
             dot_code += '        }\n'
         dot_code += '    }\n\n'
 
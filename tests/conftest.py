@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The tools are plain scripts importing each other by module name, so the tests import them the same way
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
@@ -0,0 +1,49 @@
+import gzip
+import os
+
+import netviz_batch
+import netviz_v5
+
+OPTIONS = {'svg': False, 'renderer': 'auto', 'cache_dir': None, 'sheet_reader': 'proc', 'paper_size': 'ARCH D',
+           'ratio': 'auto', 'splines': 'ortho', 'ranksep': 1, 'loader': 'csv', 'keep_duplicates': False}
+
+
+def write_csv(tmp_path):
+    path = tmp_path / "site.csv"
+    path.write_text("Domotz Name,Location,Zone,Uplink\nA,Site,Rack,Internet\nB,Site,Rack,A\n")
+    return str(path)
+
+
+def test_process_file_writes_dot(tmp_path):
+    path, outputs, error, _ = netviz_batch.process_file(write_csv(tmp_path), OPTIONS)
+    assert error is None
+    assert outputs == [str(tmp_path / "site.dot")]
+    assert (tmp_path / "site.dot").read_text().rstrip().endswith('}')
+
+
+def test_failed_emit_leaves_previous_dot_untouched(tmp_path, monkeypatch):
+    csv_file = write_csv(tmp_path)
+    (tmp_path / "site.dot").write_text("previous\n")
+
+    def fail_midway(sink, *args):
+        sink.write("digraph NetworkDiagram {\n")
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(netviz_v5, 'write_graphviz_code', fail_midway)
+    _, outputs, error, _ = netviz_batch.process_file(csv_file, OPTIONS)
+    assert outputs == [] and 'disk full' in error
+    assert (tmp_path / "site.dot").read_text() == "previous\n"
+    assert sorted(os.listdir(tmp_path)) == ["site.csv", "site.dot"]
+
+
+def test_inputs_sharing_a_stem_get_their_own_outputs(tmp_path):
+    csv_file = write_csv(tmp_path)
+    with gzip.open(tmp_path / "site.csv.gz", 'wt') as f:
+        f.write("Domotz Name,Location,Zone,Uplink\nZ,Site,Rack,Internet\n")
+    (tmp_path / "other.csv").write_text("Domotz Name,Location,Zone,Uplink\nA,Site,Rack,Internet\n")
+
+    results = netviz_batch.run_batch(netviz_batch.collect_inputs([str(tmp_path)]), OPTIONS, workers=2)
+    assert [outputs for _, outputs, _, _ in results] == [[str(tmp_path / "other.dot")], [csv_file + ".dot"],
+                                                         [csv_file + ".gz.dot"]]
+    assert '"B"' in (tmp_path / "site.csv.dot").read_text()
+    assert '"Z"' in (tmp_path / "site.csv.gz.dot").read_text()
@@ -0,0 +1,45 @@
+import os
+import stat
+
+import pytest
+
+import netviz_v5
+
+CSV = "Domotz Name,Location,Zone,Uplink\nA,Site,Rack,Internet\nB,Site,Rack,A\n"
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """A small topology CSV in the working directory, with a stand-in dot executable on PATH."""
+    dot = tmp_path / 'bin' / 'dot'
+    dot.parent.mkdir()
+    dot.write_text('#!/bin/sh\n'
+                   'if [ "$1" = "-V" ]; then echo "dot - graphviz version 0.0 (stub)" >&2; exit 0; fi\n'
+                   'cat > /dev/null\necho "<svg/>"\n')
+    dot.chmod(dot.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{dot.parent}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'site.csv').write_text(CSV)
+    return tmp_path
+
+
+def run(*argv):
+    netviz_v5.run(netviz_v5.build_parser().parse_args(['site.csv', '--renderer', 'subprocess', *argv]))
+
+
+@pytest.mark.parametrize('flags', [[], ['--pipe']])
+def test_stdout_carries_only_the_dot_when_rendering(site, capsys, flags):
+    run('--no-cache', '--no-table-cache', '--stdout', '-s', *flags)
+    out, err = capsys.readouterr()
+    assert out.lstrip().startswith('digraph') and out.endswith('}\n')
+    assert "SVG file 'site.svg' generated." in err
+    assert (site / 'site.svg').read_text() == "<svg/>\n"
+
+
+def test_unwritable_caches_are_skipped(site, capsys):
+    (site / 'blocked').write_text("a file where the cache directories would go")
+    run('--table-cache-dir', 'blocked/tables', '--cache-dir', 'blocked/render', '-d', '-s')
+    out, err = capsys.readouterr()
+    assert "##Table cache unavailable" in out and "##Render cache unavailable" in err
+    assert "DOT file 'site.dot' saved." in out and "SVG file 'site.svg' generated." in out
+    assert (site / 'site.svg').read_text() == "<svg/>\n"
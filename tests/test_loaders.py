@@ -0,0 +1,40 @@
+import gzip
+
+import pytest
+
+import netviz_v5
+
+HEADER = "Domotz Name,Location,Zone,Model,MAC,IP Address,Uplink,Source Port,Destination Port\n"
+ROWS = ("A,Site,Rack,M1,N/A,NA,None,P1,\n"
+        "\n"
+        "B,Site,Rack,,null,#N/A,A,,Q1\n"
+        "C,Site,,M3,,,A,P3,Q3\n")
+
+
+def emit(path: str, loader: str) -> str:
+    graph = netviz_v5.load_topology(path, loader, chunk_rows=2)
+    return netviz_v5.generate_graphviz_code(graph, 'ARCH D', 'auto', 'ortho', 1)
+
+
+@pytest.fixture
+def topology_csv(tmp_path):
+    path = tmp_path / "topology.csv"
+    path.write_text(HEADER + ROWS)
+    return str(path)
+
+
+def test_loaders_agree_on_na_like_values(topology_csv):
+    expected = emit(topology_csv, 'csv')
+    assert 'MAC: N_A' in expected and 'IP: NA' in expected
+    assert '"A":P1 -> "None"' in expected
+    for loader in ('pandas', 'chunked'):
+        assert emit(topology_csv, loader) == expected
+
+
+def test_compressed_input_matches_plain(topology_csv, tmp_path):
+    compressed = tmp_path / "topology.csv.gz"
+    with gzip.open(compressed, 'wt') as f:
+        f.write(HEADER + ROWS)
+    expected = emit(topology_csv, 'csv')
+    for loader in ('csv', 'pandas', 'chunked'):
+        assert emit(str(compressed), loader) == expected
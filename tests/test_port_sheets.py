@@ -0,0 +1,36 @@
+import pytest
+
+import read_nax
+import read_whole_section
+
+SWITCH_SHEET = ("SWITCH\t\tTYPE\tPORT\tVLAN\tDEVICE\n"
+                "SW 01 (Core)\t\tRJ45\t1\t\tDEV 1\n"
+                "\tMX75\tRJ45\t2\t\tDEV 2\n"
+                "\tRack 1\tRJ45\t3\n"
+                "\tSN01\tRJ45\t4\t\tDEV 4\n"
+                "\t10.0.0.1\tRJ45\t5\t10\tDEV 5\n"
+                "\t42:48:0A:5D:2F:34\tRJ45\t6\t\tDEV 6\n"
+                "\n"
+                "\t\tSFP\t8\t\tDEV 8\n")
+NAX_SHEET = ("NAX-16ZSA\t\tIN TYPE\tIN #\tIN DEVICE\tOUT TYPE\tOUT #\tOUT DEVICE\tSPEAKERS\n"
+             "Audio Matrix\t\tAnalog\t1\t\tZone\t1\tZone 1\t\n"
+             "\tRack 1\tAnalog\t2\t\tZone\t2\tZone 2\t\n"
+             "\n"
+             "\tSN01\tAnalog\t4\t\tZone\t4\tZone 4\t\n")
+
+
+@pytest.mark.parametrize('reader, sheet, device_model, edge_count, port_after_blank', [
+    (read_whole_section, SWITCH_SHEET, "MX75", 7, 'SW01Core:SW01Coref8 ->'),
+    (read_nax, NAX_SHEET, "PowerWand3000", 6, 'asdf12340000o4 ->'),
+])
+def test_blank_row_in_a_section_is_an_unconnected_port(reader, sheet, device_model, edge_count, port_after_blank,
+                                                       tmp_path, capsys):
+    path = tmp_path / 'sheet.txt'
+    path.write_text(sheet)
+    reader.generateGraphviz(str(path), "asdf12340000", device_model, "DE:AD:FA:CE:69:69", 24)
+    dot = capsys.readouterr().out
+    edges = [line for line in dot.splitlines() if '->' in line]
+    assert len(edges) == edge_count
+    assert not any('" ()"' in edge or '"  ()"' in edge for edge in edges)
+    # The blank row still holds its port, so the ports after it keep their numbers
+    assert port_after_blank in dot
@@ -0,0 +1,29 @@
+import pytest
+
+import netviz_v5
+from netviz_query import query_topology
+
+CSV = ("Domotz Name,Location,Zone,Uplink\n"
+       "Core,Site,Rack,Internet\nSW1,Site,Rack,Core\nAP1,Site,Closet,SW1\nAP2,Site,Closet,SW1\n")
+
+
+@pytest.fixture
+def graph(tmp_path):
+    path = tmp_path / 'site.csv'
+    path.write_text(CSV)
+    return netviz_v5.load_topology(str(path), 'csv')
+
+
+def query(graph, *argv):
+    return query_topology(graph, netviz_v5.build_parser().parse_args(['site.csv', *argv]))
+
+
+def test_around_keeps_devices_within_hops(graph):
+    selected = query(graph, '--around', 'AP1', '--hops', '1')
+    assert sorted(selected.name(node_id) for node_id in selected.rows) == ['AP1', 'SW1']
+    assert query(graph, '--around', 'AP1', '--hops', '0').device_count == 1
+
+
+def test_negative_hops_are_rejected(graph):
+    with pytest.raises(ValueError, match='--hops'):
+        query(graph, '--around', 'AP1', '--hops', '-1')
@@ -0,0 +1,85 @@
+import os
+import urllib.error
+import urllib.request
+
+import pytest
+
+import netviz_remote
+import sheet_server
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv('no_proxy', '127.0.0.1')
+    (tmp_path / 'exports').mkdir()
+    server = sheet_server.serve(str(tmp_path / 'exports'))
+    yield server, tmp_path / 'exports'
+    server.shutdown()
+    server.server_close()
+
+
+def sheet_url(server, name: str) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/{name}"
+
+
+def test_unchanged_sheet_is_revalidated_with_a_304(server, tmp_path):
+    server, exports = server
+    (exports / 'site.csv').write_text("Domotz Name,Uplink\nA,Internet\n")
+    url = sheet_url(server, 'site.csv')
+    cache = netviz_remote.SheetCache(str(tmp_path / 'cache'))
+
+    body_path, changed = netviz_remote.fetch_sheet(url, cache)
+    assert changed
+    with open(body_path) as f:
+        assert f.read() == "Domotz Name,Uplink\nA,Internet\n"
+
+    # The server answers the cached ETag with 304, which fetch_sheet reports as unchanged
+    request = urllib.request.Request(url, headers={'If-None-Match': cache.validators(url)['etag']})
+    with pytest.raises(urllib.error.HTTPError) as not_modified:
+        urllib.request.urlopen(request, timeout=5)
+    assert not_modified.value.code == 304
+    assert netviz_remote.fetch_sheet(url, cache) == (body_path, False)
+
+    (exports / 'site.csv').write_text("Domotz Name,Uplink\nA,Internet\nB,A\n")
+    assert netviz_remote.fetch_sheet(url, cache) == (body_path, True)
+    with open(body_path) as f:
+        assert f.read().endswith("B,A\n")
+
+
+def test_missing_sheet_is_an_error(server, tmp_path):
+    server, _ = server
+    cache = netviz_remote.SheetCache(str(tmp_path / 'cache'))
+    with pytest.raises(urllib.error.HTTPError) as missing:
+        netviz_remote.fetch_sheet(sheet_url(server, 'absent.csv'), cache)
+    assert missing.value.code == 404
+    assert not os.path.exists(cache.body_path(sheet_url(server, 'absent.csv')))
+
+
+def test_failed_regeneration_is_retried_after_a_304(server, tmp_path, monkeypatch, capsys):
+    server, exports = server
+    host, port = server.server_address[:2]
+
+    def regenerate():
+        monkeypatch.setattr('sys.argv', ['netviz_remote.py', 'site', '--no-svg', '-j', '1',
+                                         '--url-template', f"http://{host}:{port}/{{sheet_id}}.csv",
+                                         '--out-dir', str(tmp_path / 'out'), '--cache-dir', str(tmp_path / 'cache')])
+        with pytest.raises(SystemExit) as exit_info:
+            netviz_remote.main()
+        out, err = capsys.readouterr()
+        return exit_info.value.code, out + err
+
+    (exports / 'site.csv').write_text("Domotz Name,Location,Zone,Uplink\nA,Site,Rack,Internet\n")
+    assert regenerate()[0] == 0
+    # An edit that can't be drawn leaves the previous diagram in place...
+    (exports / 'site.csv').write_text("Name,Uplink\nA,Internet\n")
+    assert regenerate()[0] == 1
+    assert (tmp_path / 'out' / 'site.dot').exists()
+    # ...so the next run must not take the 304 as a sign that diagram is current
+    code, output = regenerate()
+    assert code == 1 and 'UNCHANGED' not in output
+
+    (exports / 'site.csv').write_text("Domotz Name,Location,Zone,Uplink\nB,Site,Rack,Internet\n")
+    assert regenerate()[0] == 0
+    code, output = regenerate()
+    assert code == 0 and 'UNCHANGED site' in output
@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+import netviz_render
+
+SVG_HEADER = (b'<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+              b'<!-- Generated by graphviz version 2.43.0 (0)\n -->\n<!-- Title: %3 Pages: 1 -->\n<svg/>\n')
+
+
+def test_svg_graphviz_version_reads_the_generator_comment():
+    assert netviz_render.svg_graphviz_version(SVG_HEADER) == '2.43.0 (0)'
+    assert netviz_render.svg_graphviz_version(b'<svg/>') is None
+
+
+def test_report_counts_a_batch_and_prints_the_summary(tmp_path, capsys):
+    from render_cache import RenderCache, report
+    cache = RenderCache(str(tmp_path / 'render'))
+    report(cache, [(True, None), (False, None), (False, "layout failed")])
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert capsys.readouterr().out == f"##Render cache: 1 hits, 1 misses ({tmp_path / 'render'})\n"
+
+
+def test_atomic_write_leaves_nothing_behind_on_failure(tmp_path):
+    from render_cache import atomic_write
+    target = tmp_path / 'cache' / 'entry'
+    atomic_write(str(target), b'first')
+
+    def fail(path):
+        with open(path, 'wb') as f:
+            f.write(b'half')
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        atomic_write(str(target), fail)
+    assert target.read_bytes() == b'first'
+    assert os.listdir(target.parent) == ['entry']
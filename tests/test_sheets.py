@@ -0,0 +1,14 @@
+import pytest
+
+import netviz_v5
+
+
+@pytest.mark.parametrize('flags', [['--around', 'A'], ['--location', 'Site'], ['--partition-by', 'Location'],
+                                   ['--stdout'], ['-o', 'out.svg', '-s'], ['--profile']])
+def test_per_sheet_workbook_rejects_options_it_cannot_honor(flags, tmp_path, capsys):
+    args = netviz_v5.build_parser().parse_args([str(tmp_path / 'site.xlsx')] + flags)
+    with pytest.raises(SystemExit) as exit_info:
+        netviz_v5.run(args)
+    assert exit_info.value.code == 2
+    assert '--sheets merged' in capsys.readouterr().err
+    assert not (tmp_path / 'site_sheets').exists()
@@ -0,0 +1,51 @@
+import os
+
+import table_cache
+from table_cache import TableCache
+
+COLUMNS = {'Domotz Name': ['A'], 'Uplink': ['Internet']}
+
+
+def load(cache, source):
+    """What netviz_v5.load_topology does with the cache: get, and put on a miss."""
+    if cache.get(str(source)) is None:
+        cache.put(str(source), COLUMNS, 1)
+
+
+def test_edited_source_replaces_its_table(tmp_path, monkeypatch):
+    hashed = []
+    file_digest = table_cache.file_digest
+    monkeypatch.setattr(table_cache, 'file_digest', lambda path: hashed.append(path) or file_digest(path))
+    source = tmp_path / 'site.csv'
+    source.write_text("Domotz Name,Uplink\nA,Internet\n")
+    cache = TableCache(str(tmp_path / 'cache'))
+    load(cache, source)
+
+    # Same size, new mtime: get hashes to find out, and put reuses that hash
+    source.write_text("Domotz Name,Uplink\nB,Internet\n")
+    os.utime(source, ns=(1, 1))
+    hashed.clear()
+    load(cache, source)
+    assert len(hashed) == 1
+    assert cache.misses == 2
+    assert len(cache.entries()) == len(cache._table_files()) == 1
+    assert cache.purge() == 1
+
+
+def test_evict_drops_entries_of_deleted_sources(tmp_path, monkeypatch):
+    monkeypatch.setattr(table_cache, 'ORPHAN_GRACE_SECONDS', 0)
+    kept, deleted = tmp_path / 'kept.csv', tmp_path / 'deleted.csv'
+    kept.write_text("Domotz Name,Uplink\nA,Internet\n")
+    deleted.write_text("Domotz Name,Uplink\nB,Internet\n")
+    cache = TableCache(str(tmp_path / 'cache'))
+    load(cache, kept)
+    load(cache, deleted)
+    stray = tmp_path / 'cache' / 'ff' / 'stray.cols'
+    stray.parent.mkdir()
+    stray.write_bytes(b'left by an interrupted run')
+
+    deleted.unlink()
+    assert cache.evict() == 2
+    assert [entry['source'] for entry in cache.entries()] == [os.path.realpath(kept)]
+    assert len(cache._table_files()) == 1
+    assert cache.get(str(kept)) is not None
@@ -0,0 +1,22 @@
+import netviz_v5
+from netviz_watch import IncrementalEmitter
+
+HEADER = "Domotz Name,Location,Zone,Uplink,Source Port,Destination Port\n"
+
+
+def emit(emitter, tmp_path, rows: str) -> str:
+    path = tmp_path / "site.csv"
+    path.write_text(HEADER + rows)
+    graph, _ = netviz_v5.load_normalized_topology(str(path), 'csv')
+    return emitter.emit(graph)[0]
+
+
+def test_edit_to_merged_parallel_link_is_re_emitted(tmp_path):
+    before = "A,Site,Rack,B,P1,Q1\nA,Site,Rack,B,P2,Q2\nB,Site,Rack,Internet,,\n"
+    after = "A,Site,Rack,B,P1,Q1\nA,Site,Rack,B,P9,Q2\nB,Site,Rack,Internet,,\n"
+    emitter = IncrementalEmitter('ARCH D', 'auto', 'ortho', 1)
+    assert 'P2 to Q2' in emit(emitter, tmp_path, before)
+
+    dot_text = emit(emitter, tmp_path, after)
+    assert 'P9 to Q2' in dot_text and 'P2 to Q2' not in dot_text
+    assert dot_text == emit(IncrementalEmitter('ARCH D', 'auto', 'ortho', 1), tmp_path, after)